@@ -0,0 +1,53 @@
+"""
+Kaltstart-Zeit von flowcore (python -X importtime).
+
+    python benchmarks/bench_import.py [--runs N] [--top N]
+
+Startet pro Lauf einen frischen Interpreter mit 'import flowcore' und gibt die kumulierte
+Importzeit von flowcore (Bestwert) sowie die teuersten direkt oder indirekt geladenen
+Module aus. Dass Matplotlib, PIL und Streamlit nicht geladen werden, prüft
+tests/test_lazy_imports.py.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_trace():
+    """Führt 'python -X importtime -c "import flowcore"' aus -> {Modulname: kumulierte Zeit in µs}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import flowcore'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaltstart-Zeit von import flowcore")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="Anzahl der teuersten Top-Level-Pakete")
+    args = parser.parse_args(argv)
+
+    traces = [import_trace() for _ in range(args.runs)]
+    best = min(traces, key=lambda trace: trace['flowcore'])
+    print(f"import flowcore: {best['flowcore'] / 1000:.0f} ms (Bestwert aus {args.runs} Läufen)")
+    packages = {}
+    for name, micros in best.items():
+        if '.' not in name and name != 'flowcore':
+            packages[name] = micros
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:24} {micros / 1000:7.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Micro-Benchmark für generate_comprehensive_smart_report.
+
+    python benchmarks/bench_report.py [--profiles N] [--runs N] [--cache] [--baseline REF]
+
+Misst Berichte pro Sekunde über zufällige (festes Seed) Profile, Bestwert aus mehreren Läufen.
+Standardmässig ohne den prozessweiten Berichts-Cache, damit der Aufbau selbst gemessen wird.
+Mit --baseline wird zusätzlich flowcore/reporting.py aus einer beliebigen git-Referenz
+(Branch, Tag oder Commit, z.B. --baseline main) geladen, auf identische Ausgabe geprüft
+und mitgemessen.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import flowcore  # noqa: E402
+
+
+def random_profiles(count, seed=7):
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        data = {"Name": rng.choice(["", "Alex", "Bea", "Zoë"])}
+        for domain in flowcore.DOMAINS:
+            data[f"Skill_{domain}"] = rng.randint(1, 7)
+            data[f"Challenge_{domain}"] = rng.randint(1, 7)
+            data[f"Time_{domain}"] = rng.randint(-3, 3)
+        profiles.append(data)
+    return profiles
+
+
+def load_baseline_reporting(revision):
+    """flowcore/reporting.py aus einer git-Revision als Untermodul von flowcore laden"""
+    source = subprocess.run(['git', 'show', f'{revision}:flowcore/reporting.py'], cwd=REPO_ROOT,
+                            capture_output=True, check=True).stdout
+    name = f"flowcore._baseline_reporting_{revision}"
+    spec = importlib.util.spec_from_loader(name, loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "flowcore"
+    module.__file__ = os.path.join(REPO_ROOT, 'flowcore', 'reporting.py')
+    sys.modules[name] = module
+    exec(compile(source, f"{revision}:flowcore/reporting.py", 'exec'), module.__dict__)
+    return module
+
+
+def best_time(generate, profiles, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        for data in profiles:
+            generate(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-Benchmark der Berichtserstellung")
+    parser.add_argument('--profiles', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--cache', action='store_true', help="Berichts-Cache (REPORT_CACHE_SIZE) eingeschaltet lassen")
+    parser.add_argument('--baseline', metavar='REF', help="zusätzlich reporting.py aus dieser git-Referenz (Branch, Tag, Commit) messen")
+    args = parser.parse_args(argv)
+
+    if not args.cache:
+        flowcore.configure_report_cache(0)
+    profiles = random_profiles(args.profiles)
+    candidates = [("aktuell", flowcore.generate_comprehensive_smart_report)]
+    if args.baseline:
+        baseline = load_baseline_reporting(args.baseline)
+        mismatches = sum(baseline.generate_comprehensive_smart_report(d) != flowcore.generate_comprehensive_smart_report(d)
+                         for d in profiles)
+        print(f"Vergleich mit {args.baseline}: {len(profiles) - mismatches}/{len(profiles)} Berichte identisch")
+        candidates.insert(0, (args.baseline, baseline.generate_comprehensive_smart_report))
+
+    for label, generate in candidates:
+        seconds = best_time(generate, profiles, args.runs)
+        print(f"{label}: {len(profiles) / seconds:,.0f} Berichte/s ({seconds * 1e6 / len(profiles):.0f} µs/Bericht)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Rerun-Latenz der Einzelanalyse beim Verschieben eines Sliders (Streamlit AppTest).
+
+    python benchmarks/bench_rerun.py [--runs N] [--domain DOMÄNE]
+
+Misst für dieselbe Slider-Bewegung zwei Varianten:
+- App: der Lauf, den der Browser anfordert - vor der Analyse nur das Fragment des
+  Domänen-Blocks, danach (normale Widgets) das ganze Skript; Folgeläufe wie
+  st.rerun(scope="app") werden mitgezählt
+- voll: das ganze Skript läuft neu (so lief jede Slider-Bewegung vor render_domain_input)
+jeweils vor und nach "Analyse starten". Angegeben werden Median der Skriptlaufzeit, Anzahl
+der Läufe pro Bewegung und Anzahl gesendeter Elemente (Deltas). Wie im Server bleibt der
+Bytecode-Cache über Reruns bestehen; die Datenbank landet in einem temporären Verzeichnis.
+
+Greift auf Interna von streamlit.testing zu (getestet mit Streamlit 1.65).
+"""
+import argparse
+import functools
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import streamlit.testing.v1.app_test as app_test_module  # noqa: E402
+import streamlit.testing.v1.local_script_runner as local_script_runner  # noqa: E402
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from flowcore import DOMAINS  # noqa: E402
+
+# AppTest legt pro Lauf einen neuen Bytecode-Cache an - der Server nicht
+_script_cache = app_test_module.ScriptCache()
+app_test_module.ScriptCache = lambda: _script_cache
+local_script_runner.ScriptCache = lambda: _script_cache
+
+_run_stats = []
+_original_init = local_script_runner.LocalScriptRunner.__init__
+
+
+def _recording_init(self, *args, **kwargs):
+    """Laufzeit und Anzahl der Skript- bzw. Fragment-Läufe (auch Folgeläufe per st.rerun) und Deltas"""
+    _original_init(self, *args, **kwargs)
+    record = {'runs': 0, 'seconds': 0.0, 'deltas': 0}
+    _run_stats.append(record)
+
+    def on_event(sender, event, **kw):
+        if event == ScriptRunnerEvent.SCRIPT_STARTED:
+            record['runs'] += 1
+            record['start'] = time.perf_counter()
+        elif event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG:
+            record['deltas'] += 1
+        elif (event.name.startswith('SCRIPT_STOPPED') or event.name == 'FRAGMENT_STOPPED_WITH_SUCCESS') \
+                and 'start' in record:
+            record['seconds'] += time.perf_counter() - record.pop('start')
+    self.on_event.connect(on_event, weak=False)
+
+
+local_script_runner.LocalScriptRunner.__init__ = _recording_init
+
+
+def domain_fragment_id(at, domain):
+    """Fragment-ID des Domänen-Blocks oder None, wenn die Slider gerade keine Fragmente sind"""
+    storage = at._fragment_storage
+    fragment_ids = sorted(storage._fragments, key=storage._registration_sequence_by_id.get)
+    return fragment_ids[list(DOMAINS).index(domain)] if len(fragment_ids) == len(DOMAINS) else None
+
+
+def measure(at, domain, runs, fragment_scoped):
+    """Median Skriptlaufzeit (ms), Läufe und Deltas für runs Bewegungen des Fähigkeiten-Sliders"""
+    fragment_id = domain_fragment_id(at, domain) if fragment_scoped else None
+    timings, run_counts, deltas = [], [], []
+    for i in range(runs):
+        if fragment_id is not None:
+            local_script_runner.RerunData = functools.partial(RerunData, fragment_id_queue=[fragment_id])
+        at.slider(key=f"skill_{domain}").set_value(1 + i % 7)
+        del _run_stats[:]
+        at.run()
+        local_script_runner.RerunData = RerunData
+        if at.exception:
+            raise RuntimeError(at.exception)
+        timings.append(sum(r['seconds'] for r in _run_stats))
+        run_counts.append(sum(r['runs'] for r in _run_stats))
+        deltas.append(sum(r['deltas'] for r in _run_stats))
+        # Voller Lauf, damit der Element-Baum für die nächste Interaktion vollständig ist
+        at.run()
+    return statistics.median(timings) * 1000, statistics.median(run_counts), statistics.median(deltas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rerun-Latenz der Einzelanalyse")
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--domain', default=next(iter(DOMAINS)), choices=list(DOMAINS))
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+    os.chdir(tempfile.mkdtemp(prefix="flowcore-bench-"))
+
+    at = AppTest.from_file(os.path.join(REPO_ROOT, 'app.py'), default_timeout=60)
+    at.run()
+    for phase in ("vor Analyse", "nach Analyse"):
+        if phase == "nach Analyse":
+            at.checkbox(key="global_confirm").check().run()
+            at.button[0].click().run()
+        for label, fragment_scoped in (("App", True), ("voll", False)):
+            ms, run_count, deltas = measure(at, args.domain, args.runs, fragment_scoped)
+            print(f"{phase:13} {label:5} {ms:6.1f} ms  {run_count:2.0f} Läufe  {deltas:5.0f} Deltas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
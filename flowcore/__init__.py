@@ -0,0 +1,93 @@
+"""
+flowcore - UI-freier Kern der Flow-Analyse: Domänen-Konfiguration, Flow-Berechnung,
+Berichte, Team-Analyse (CBI, auch als Hintergrund-Job), Import/Export und SQLite-Speicher.
+Streamlit wird nicht benötigt; app.py ist nur eine Oberfläche über diesem Paket.
+
+Die öffentliche API steht in __all__. Einstellungen wie Worker-Anzahl, Cache-Grössen oder
+DB-Pragmas bleiben in flowcore.config, Verbindungs- und Migrations-Details in flowcore.storage.
+"""
+from .config import (
+    DOMAINS, TIME_PERCEPTION_SCALE, SKILL_DESCRIPTIONS, CHALLENGE_DESCRIPTIONS, TIME_DESCRIPTIONS,
+    TEAM_METRICS, RATING_DTYPE, DOMAIN_CATEGORIES, RATING_RANGES, TEAM_BUNDLE_VERSION,
+)
+from .scoring import (
+    validate_data, calculate_flow, FLOW_ZONES, ZONE_NAMES, ZONE_EXPLANATIONS, ZONE_CODES,
+    calculate_flow_array, RATING_MIN, RATING_MAX, is_integer_rating, lookup_flow_array,
+    get_cached_flow,
+)
+from .plotting import (
+    FLOW_CHANNEL_X, FLOW_CHANNEL_LOWER, FLOW_CHANNEL_UPPER, INDIVIDUAL_PLOT_LABELS,
+    TEAM_PLOT_LABELS, draw_flow_channel, draw_flow_points, add_flow_legend, individual_plot_points,
+    team_plot_points, create_flow_plot, create_team_flow_plot, get_flow_plot_background,
+    render_flow_points_png, flow_plot_ratings, render_flow_plot_png, FLOW_CHANNEL_BREAKPOINTS,
+    FLOW_BAND_STYLES, flow_band_values, flow_plot_spec, time_distribution_spec,
+    create_time_distribution_plot,
+)
+from .reporting import (
+    generate_time_based_recommendation, generate_domain_interpretation,
+    generate_comprehensive_smart_report,
+    report_ratings, configure_report_cache, report_cache_info,
+    iter_interpretation_fragments, interpretation_cache_path, build_interpretation_cache, get_interpretation_fragments,
+)
+from .team import (
+    compute_domain_stats, new_team_accumulator, accumulate_team_chunk, domain_stats_from_moments,
+    finalize_team_accumulator, calculate_team_cbi_analysis,
+    build_cbi_analysis, team_overview,
+)
+from .exchange import (
+    build_machine_readable_payload, payload_to_data, frame_to_payloads,
+    export_machine_readable_json, export_machine_readable_csv_bytes, detect_upload_format,
+    export_team_bundle_bytes, load_team_bundle, parse_uploaded_report_file, parse_and_normalize_upload,
+    validate_uploaded_dataframe, iter_parsed_uploads, iter_uploaded_file_frames, aggregate_uploaded_files_to_df,
+    iter_validated_upload_frames, validate_and_prepare_data, to_compact_team_frame, parse_created_at,
+)
+from .storage import (
+    init_db, save_to_db, bulk_save_payloads, get_db_filter_options, query_team_aggregates,
+    get_materialized_team_aggregates, reset_database,
+)
+from .pipeline import (
+    TEAM_ANALYSIS_STAGES, team_flow_chart, prepare_team_results,
+    new_team_analysis_job, run_team_analysis, start_team_analysis, cancel_team_analysis,
+    team_analysis_finished,
+)
+
+__all__ = [
+    # config: Domänen und Datenformat
+    'DOMAINS', 'TIME_PERCEPTION_SCALE', 'SKILL_DESCRIPTIONS', 'CHALLENGE_DESCRIPTIONS', 'TIME_DESCRIPTIONS',
+    'TEAM_METRICS', 'RATING_DTYPE', 'DOMAIN_CATEGORIES', 'RATING_RANGES', 'TEAM_BUNDLE_VERSION',
+    # scoring
+    'validate_data', 'calculate_flow', 'FLOW_ZONES', 'ZONE_NAMES', 'ZONE_EXPLANATIONS', 'ZONE_CODES',
+    'calculate_flow_array', 'RATING_MIN', 'RATING_MAX', 'is_integer_rating', 'lookup_flow_array',
+    'get_cached_flow',
+    # plotting
+    'FLOW_CHANNEL_X', 'FLOW_CHANNEL_LOWER', 'FLOW_CHANNEL_UPPER', 'INDIVIDUAL_PLOT_LABELS',
+    'TEAM_PLOT_LABELS', 'draw_flow_channel', 'draw_flow_points', 'add_flow_legend', 'individual_plot_points',
+    'team_plot_points', 'create_flow_plot', 'create_team_flow_plot', 'get_flow_plot_background',
+    'render_flow_points_png', 'flow_plot_ratings', 'render_flow_plot_png', 'FLOW_CHANNEL_BREAKPOINTS',
+    'FLOW_BAND_STYLES', 'flow_band_values', 'flow_plot_spec', 'time_distribution_spec',
+    'create_time_distribution_plot',
+    # reporting
+    'generate_time_based_recommendation', 'generate_domain_interpretation',
+    'generate_comprehensive_smart_report',
+    'report_ratings', 'configure_report_cache', 'report_cache_info',
+    'iter_interpretation_fragments', 'interpretation_cache_path', 'build_interpretation_cache',
+    'get_interpretation_fragments',
+    # team
+    'compute_domain_stats', 'new_team_accumulator', 'accumulate_team_chunk', 'domain_stats_from_moments',
+    'finalize_team_accumulator', 'calculate_team_cbi_analysis',
+    'build_cbi_analysis', 'team_overview',
+    # exchange
+    'build_machine_readable_payload', 'payload_to_data', 'frame_to_payloads',
+    'export_machine_readable_json', 'export_machine_readable_csv_bytes', 'detect_upload_format',
+    'export_team_bundle_bytes', 'load_team_bundle', 'parse_uploaded_report_file', 'parse_and_normalize_upload',
+    'validate_uploaded_dataframe', 'iter_parsed_uploads', 'iter_uploaded_file_frames',
+    'aggregate_uploaded_files_to_df', 'iter_validated_upload_frames', 'validate_and_prepare_data',
+    'to_compact_team_frame', 'parse_created_at',
+    # storage
+    'init_db', 'save_to_db', 'bulk_save_payloads', 'get_db_filter_options', 'query_team_aggregates',
+    'get_materialized_team_aggregates', 'reset_database',
+    # pipeline
+    'TEAM_ANALYSIS_STAGES', 'team_flow_chart', 'prepare_team_results',
+    'new_team_analysis_job', 'run_team_analysis', 'start_team_analysis', 'cancel_team_analysis',
+    'team_analysis_finished',
+]
@@ -0,0 +1,227 @@
+"""
+Stapelverarbeitung ohne Oberfläche: persönliche Berichte und Exporte für viele archivierte Exporte.
+
+    python -m flowcore EXPORTS [EXPORTS ...] -o AUSGABE [--jobs N]
+
+EXPORTS sind Verzeichnisse (alle .json/.csv/.npz darin) oder Glob-Muster.
+Pro Person und Einreichung entstehen Bericht (.txt) sowie JSON- und CSV-Export,
+zusätzlich eine zusammenfassung.csv mit Flow-Index und Zone pro Domäne.
+Die Dateinamen hängen nur vom Inhalt der Einreichung ab - ein erneuter Lauf in dasselbe
+Ausgabeverzeichnis überschreibt die vorhandenen Dateien, statt Kopien anzulegen.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+
+from .config import DOMAINS
+from .exchange import (detect_upload_format, export_machine_readable_csv_bytes,
+                       export_machine_readable_json, frame_to_payloads, parse_and_normalize_upload, parse_created_at,
+                       payload_to_data, validate_and_prepare_data)
+from .reporting import generate_comprehensive_smart_report
+from .scoring import calculate_flow, validate_data
+
+BATCH_INPUT_EXTENSIONS = ('.json', '.csv', '.npz')
+BATCH_SUMMARY_FILE = "zusammenfassung.csv"
+BATCH_SUMMARY_COLUMNS = ['quelle', 'name', 'created_at', 'domain', 'skill', 'challenge', 'time_perception',
+                         'flow_index', 'zone']
+# Dateien pro Auftrag an einen Worker-Prozess - weniger Pickling-Overhead bei vielen kleinen Exporten
+BATCH_CHUNK_SIZE = 16
+
+def collect_export_files(inputs):
+    """Verzeichnisse und Glob-Muster -> sortierte Liste der Export-Dateien (ohne Duplikate)"""
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            paths.update(
+                os.path.join(pattern, entry) for entry in os.listdir(pattern)
+                if os.path.splitext(entry)[1].lower() in BATCH_INPUT_EXTENSIONS
+            )
+        else:
+            paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+def _file_stem(data, created_at):
+    """
+    Dateinamen-Teil wie bei den Downloads der Einzelanalyse, ergänzt um die Uhrzeit der Einreichung
+    und einen kurzen Hash über Name, Zeitpunkt und Ratings. Gleiche Einreichung -> gleicher Name,
+    verschiedene Einreichungen (z.B. mehrere ohne Namen und Datum) kollidieren nicht.
+    """
+    name = data['Name']
+    safe_name = re.sub(r'[^\w-]+', '_', name).strip('_') or 'unbenannt'
+    stamp = pd.Timestamp(created_at).strftime('%Y%m%d_%H%M%S') if created_at else 'ohne_datum'
+    ratings = [data[f"{metric}_{domain}"] for domain in DOMAINS for metric in ("Skill", "Challenge", "Time")]
+    digest = hashlib.sha256(json.dumps([name, created_at, ratings], default=str).encode('utf-8')).hexdigest()[:8]
+    return f"{safe_name}_{stamp}_{digest}"
+
+def _write_output(output_dir, prefix, stem, suffix, content):
+    """Schreibt bzw. überschreibt eine Ausgabedatei atomar (temporäre Datei + os.replace)"""
+    path = os.path.join(output_dir, f"{prefix}_{stem}{suffix}")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if isinstance(content, bytes):
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+def read_export_payloads(path, errors):
+    """
+    Liest eine Export-Datei als Liste von Payloads (Format build_machine_readable_payload).
+    Einzel-Exporte im JSON-Format werden direkt übernommen - der DataFrame-Umweg kostet bei
+    5 Zeilen ein Vielfaches des Berichts. CSV-Exporte und Team-Bundles laufen über die
+    Upload-Validierung; ungültige Zeilen werden in errors vermerkt.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    if detect_upload_format(path, content) == "json":
+        try:
+            payload = json.loads(content.decode('utf-8-sig'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            errors.append(f"{path}: ungültiges JSON ({e})")
+            return []
+        return [payload]
+
+    upload = BytesIO(content)
+    upload.name = path
+    parsed, error = parse_and_normalize_upload(upload)
+    if parsed is None:
+        errors.append(f"{path}: {error}")
+        return []
+    frame, error, quarantined = validate_and_prepare_data(parsed)
+    if not quarantined.empty:
+        errors.append(f"{path}: {len(quarantined)} ungültige Zeile(n) übersprungen")
+    if frame is None:
+        errors.append(f"{path}: {error}")
+        return []
+    return frame_to_payloads(frame)
+
+def _created_at(payload):
+    """
+    created_at des Payloads als normalisierter ISO-String oder None. Wie beim CSV- und
+    Bundle-Pfad über parse_created_at: Offsets werden nach UTC umgerechnet, damit dieselbe
+    Einreichung unabhängig vom Eingabeformat denselben Zeitstempel und Dateinamen erhält.
+    """
+    value = payload.get("created_at") if isinstance(payload, dict) else None
+    if not isinstance(value, str):
+        return None
+    parsed = parse_created_at(pd.Series([value], dtype=object)).iloc[0]
+    return None if pd.isna(parsed) else parsed.isoformat()
+
+def process_export_file(path, output_dir):
+    """
+    Verarbeitet eine Export-Datei (auch Team-Bundles mit vielen Personen) und schreibt
+    pro Einreichung Bericht und Exporte nach output_dir.
+    Fehler betreffen nur diese Datei und landen in errors - der restliche Lauf geht weiter.
+    Rückgabe: dict mit source, reports, summary_rows und errors.
+    """
+    result = {'source': path, 'reports': 0, 'summary_rows': [], 'errors': []}
+    try:
+        _process_export_payloads(path, output_dir, result)
+    except Exception as e:
+        result['errors'].append(f"{path}: Verarbeitung abgebrochen ({type(e).__name__}: {e})")
+    return result
+
+def _process_export_payloads(path, output_dir, result):
+    for payload in read_export_payloads(path, result['errors']):
+        data = payload_to_data(payload)
+        created_at = _created_at(payload)
+        if data is None or not validate_data(data):
+            name = payload.get("Name", "") if isinstance(payload, dict) else ""
+            result['errors'].append(f"{path}: Einreichung '{name}' ist unvollständig oder ungültig")
+            continue
+
+        # "Name": null oder Zahlen in fremden Exporten
+        data['Name'] = str(data['Name'] or "")
+        stem = _file_stem(data, created_at)
+        # Profile wiederholen sich im Stapel kaum - der Berichts-Cache würde nur Speicher pro Worker belegen
+        _write_output(output_dir, 'flow_bericht', stem, '.txt', generate_comprehensive_smart_report(data, use_cache=False))
+        _write_output(output_dir, 'flow_export', stem, '.json', export_machine_readable_json(data, created_at))
+        _write_output(output_dir, 'flow_export', stem, '.csv', export_machine_readable_csv_bytes(data, created_at))
+
+        for domain in DOMAINS:
+            skill, challenge = data[f"Skill_{domain}"], data[f"Challenge_{domain}"]
+            flow_index, zone, _ = calculate_flow(skill, challenge)
+            result['summary_rows'].append((path, data['Name'], created_at, domain, skill, challenge,
+                                           data[f"Time_{domain}"], round(flow_index, 2), zone))
+        result['reports'] += 1
+
+def _process_chunk(paths, output_dir):
+    return [process_export_file(path, output_dir) for path in paths]
+
+def run_batch(paths, output_dir, jobs=None, progress=None):
+    """
+    Verarbeitet alle Dateien, mit jobs > 1 in einem Prozess-Pool (None = alle Kerne).
+    progress(done, total, result) wird nach jeder Datei aufgerufen, in Eingabereihenfolge.
+    Schreibt die zusammenfassung.csv und gibt (Anzahl Berichte, Fehlerliste) zurück.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    chunks = [paths[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(paths), BATCH_CHUNK_SIZE)]
+
+    if jobs > 1 and len(chunks) > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        chunk_results = executor.map(_process_chunk, chunks, [output_dir] * len(chunks))
+    else:
+        executor = None
+        chunk_results = (_process_chunk(chunk, output_dir) for chunk in chunks)
+
+    reports = 0
+    errors = []
+    summary_rows = []
+    done = 0
+    try:
+        for results in chunk_results:
+            for result in results:
+                done += 1
+                reports += result['reports']
+                errors.extend(result['errors'])
+                summary_rows.extend(result['summary_rows'])
+                if progress is not None:
+                    progress(done, len(paths), result)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    pd.DataFrame(summary_rows, columns=BATCH_SUMMARY_COLUMNS).to_csv(
+        os.path.join(output_dir, BATCH_SUMMARY_FILE), index=False, encoding='utf-8')
+    return reports, errors
+
+def _print_progress(done, total, result):
+    print(f"[{done}/{total}] {result['source']}: {result['reports']} Bericht(e)", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m flowcore",
+        description="Erstellt persönliche Flow-Berichte und maschinenlesbare Exporte für viele Export-Dateien.")
+    parser.add_argument('inputs', nargs='+', metavar='EXPORTS',
+                        help="Verzeichnisse oder Glob-Muster (z.B. 'archiv/**/*.json') mit JSON-, CSV- oder Bundle-Exporten")
+    parser.add_argument('-o', '--output', required=True, help="Ausgabeverzeichnis für Berichte und Exporte")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Anzahl Worker-Prozesse (Standard: alle Kerne, 1 = ohne Prozess-Pool)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Keine Fortschrittsausgabe")
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs muss mindestens 1 sein")
+
+    paths = collect_export_files(args.inputs)
+    if not paths:
+        parser.error("keine Export-Dateien gefunden")
+
+    start = time.perf_counter()
+    reports, errors = run_batch(paths, args.output, args.jobs, None if args.quiet else _print_progress)
+    for error in errors:
+        print(f"Warnung: {error}", file=sys.stderr)
+    print(f"{reports} Bericht(e) aus {len(paths)} Datei(en) in {time.perf_counter() - start:.1f} s -> {args.output}",
+          file=sys.stderr)
+    return 0 if reports else 1
@@ -0,0 +1,229 @@
+"""Domänen, Skalen und Konstanten der Flow-Analyse"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# ===== KONFIGURATION =====
+DOMAINS = {
+    "Team-Veränderungen": {
+        "examples": "Personalwechsel, Ausfälle, Rollenänderungen, neue Teammitglieder",
+        "color": "#FF6B6B",
+        "bischof": "Bindungssystem - Bedürfnis nach Vertrautheit und Sicherheit",
+        "grawe": "Bedürfnisse: Bindung, Orientierung/Kontrolle, Selbstwertschutz",
+        "flow": "Balance zwischen Vertrautheit (Fähigkeit) und Neuem (Herausforderung)",
+        "explanation": """In deinem Arbeitsalltag verändern sich Teams ständig: neue Kollegen kommen hinzu, Rollen verschieben sich, manchmal fallen Personen aus.
+        
+Beispiel: Ein Mitarbeiter ruft morgens an und sagt kurzfristig ab.
+
+Positiv erlebt: Du bleibst ruhig, weil du Erfahrung hast und vertraust, dass Aufgaben kompetent verteilt werden.
+
+Negativ erlebt: Du fühlst dich gestresst und ängstlich, selbst wenn sich später herausstellt, dass alles in Ordnung ist.""",
+        "textbausteine": {
+            "Überforderung": "Veränderungen im Team können dein Gefühl nach Sicherheit und Vertrautem stark erschüttern, weil gewohnte Abläufe und Rollen ins Wanken geraten. Gerade jetzt ist es wichtig, deine eigenen Grenzen wahrzunehmen und offen zu kommunizieren. Vereinbare mit Kolleg:innen kleine, machbare Schritte und nutze den Austausch, um gemeinsam wieder Stabilität zu gewinnen.",
+            "Ideale Passung": "Im Moment scheinen dein Neugier-System und dein Gefühl nach Sicherheit und Vertrautem gut im Gleichgewicht zu sein: Veränderungen bringen frischen Wind, ohne dich zu überfordern. Diese Phase eignet sich perfekt, um deine Stärken einzubringen und anderen Sicherheit zu vermitteln – so kann im Team ein Flow-Zustand entstehen.",
+            "Unterforderung": "Wenn sich im Team wenig bewegt, kann dein Neugier-System unterfordert sein. Überlege, ob du neue Aufgaben übernehmen kannst, wie z.B. die Moderation einer Teamsitzung oder das Einarbeiten neuer Kolleg:innen. So bringst du neue Energie ins Team und bleibst selbst motiviert."
+        }
+    },
+    "Veränderungen im Betreuungsbedarf der Klient:innen": {
+        "examples": "steigender Pflegebedarf, neue pädagogische Anforderungen, komplexere Cases",
+        "color": "#4ECDC4",
+        "bischof": "Explorationssystem - Umgang mit veränderten Anforderungen",
+        "grawe": "Bedürfnisse: Kompetenzerleben, Kontrolle, Lustgewinn/Unlustvermeidung",
+        "flow": "Passung zwischen professionellen Kompetenzen und Anforderungen",
+        "explanation": """Der Betreuungsbedarf der Klienten kann sich verändern, z. B. durch gesundheitliche Verschlechterungen oder neue Anforderungen.
+
+Beispiel: Ein Klient benötigt plötzlich mehr Unterstützung im Alltag und zeigt Verhaltensauffälligkeiten.
+
+Positiv erlebt: Du spürst, dass du die Situation gut einschätzen kannst, weil du Erfahrung mit ähnlichen Fällen hast und weisst, wie du angemessen reagieren kannst.
+
+Negativ erlebt: Du fühlst dich überfordert und unsicher, jede kleine Veränderung löst Stress aus, weil du Angst hast, etwas falsch zu machen.""",
+        "textbausteine": {
+            "Überforderung": "Wenn sich der Betreuungsbedarf stark verändert, kann das Gefühl entstehen, nicht mehr allen Anforderungen gerecht zu werden. Dein Gefühl nach Sicherheit und Vertrautem sucht in solchen Momenten nach Halt und klaren Strukturen. Nimm dir Zeit, dich Schritt für Schritt einzuarbeiten, und kläre frühzeitig Zuständigkeiten im Team, um Sicherheit zu gewinnen.",
+            "Ideale Passung": "Aktuell scheinen deine Kompetenzen gut zu den Bedürfnissen der Klient:innen zu passen. Dein Neugier-System ist aktiviert und motiviert, während dein Gefühl nach Sicherheit und Vertrautem dir Stabilität gibt. Diese Balance ermöglicht dir, sowohl Sicherheit als auch kreative Impulse weiterzugeben.",
+            "Unterforderung": "Wenn sich die Betreuungssituation sehr routiniert anfühlt, kann dein Neugier-System unbefriedigt bleiben. Vielleicht kannst du neue Angebote oder kreative Projekte einbringen, um sowohl dich selbst als auch die Klient:innen zu inspirieren."
+        }
+    },
+    "Prozess- oder Verfahrensänderungen": {
+        "examples": "Anpassung bei Dienstübergaben, Dokumentation, interne Abläufe, neue Software",
+        "color": "#FFD166",
+        "bischof": "Autonomiesystem - Kontrolle und Selbstwirksamkeit in Veränderungsprozessen",
+        "grawe": "Bedürfnisse: Orientierung, Kontrolle, Selbstwert (durch Routine)",
+        "flow": "Balance zwischen Routinesicherheit und Lernherausforderungen",
+        "explanation": """Interne Abläufe ändern sich regelmässig, z. B. bei Dienstübergaben, Dokumentationen oder neuer Software.
+
+Beispiel: Ein neues digitales Dokumentationssystem wird eingeführt.
+
+Positiv erlebt: Du begegnest der Umstellung mit Gelassenheit, weil du auf deine bisherigen Lernerfolge vertraust und weisst, dass du dir neue Abläufe schnell aneignen kannst – sei es durch Schulungen oder deine eigene Auffassungsgabe.
+
+Negativ erlebt: Du fühlst dich gestresst bei jedem Versuch, das neue System zu benutzen, weil du Angst hast, Fehler zu machen, auch wenn sich später alles als unkompliziert herausstellt.""",
+        "textbausteine": {
+            "Überforderung": "Neue Prozesse können dein Gefühl nach Kontrolle und Selbstwirksamkeit stark beeinträchtigen, weil vertraute Handlungsspielräume wegfallen. Versuche, aktiv Einfluss auf die Gestaltung zu nehmen und kläre frühzeitig, wo du Entscheidungsmöglichkeiten hast.",
+            "Ideale Passung": "Du behältst in Prozessänderungen das Gefühl der Selbstwirksamkeit. Dein Autonomiesystem gibt dir Sicherheit, während du gleichzeitig offen für neue Strukturen bleibst. Nutze diese Stärke, um Kolleg:innen zu unterstützen, die sich noch unsicher fühlen – so profitiert das ganze Team.",
+            "Unterforderung": "Wenn dir Prozesse zu starr vorgegeben sind, kann dein Autonomiesystem unterfordert sein. Vielleicht kannst du Gestaltungsspielräume suchen oder Optimierungsvorschläge einbringen."
+        }
+    },
+    "Kompetenzanforderungen / neue Aufgaben": {
+        "examples": "neue Aufgabenfelder, zusätzliche Qualifikationen, Schulungen, Zertifizierations",
+        "color": "#06D6A0",
+        "bischof": "Explorationssystem - Kompetenzerweiterung und Wachstum",
+        "grawe": "Bedürfnisse: Selbstwerterhöhung, Kompetenzerleben, Kontrolle",
+        "flow": "Optimale Lernherausforderung ohne Überforderung",
+        "explanation": """Manchmal ergeben sich neue Herausforderungen, die deinen Aufgabenbereich erweitern.
+
+Beispiel: Du sollst eine neue Aufgabe übernehmen, etwa eine neue Mitarbeiterin in den Arbeitsablauf einführen.
+
+Positiv erlebt: Du fühlst dich sicher und neugierig, weil du ähnliche Aufgaben bereits gemeistert hast und dein Wissen anwenden kannst.
+
+Negativ erlebt: Du bist unsicher und gestresst, weil du Angst hast, den Anforderungen nicht gerecht zu werden, selbst wenn du später die Aufgabe gut bewältigst.""",
+        "textbausteine": {
+            "Überforderung": "Wenn die Anforderungen deine aktuellen Fähigkeiten übersteigen, reagiert dein Gefühl nach Sicherheit und Vertrautem oft mit Stress. Plane dein Lernen in kleinen, machbaren Etappen und suche dir Unterstützung – zum Beispiel durch Supervision oder Lernpartnerschaften. So kann dein Neugier-System schrittweise aktiv werden, anstatt in Überforderung zu erstarren.",
+            "Ideale Passung": "Im Moment passt dein Können optimal zu den Anforderungen. Dein Neugier-System ist motiviert, während dein Gefühl nach Sicherheit und Vertrautem dir Stabilität gibt. Diese Phase ist ideal, um dein Wissen bewusst auszubauen und es mit Kolleg:innen zu teilen.",
+            "Unterforderung": "Wenn du dich fachlich unterfordert fühlst, braucht dein Neugier-System neue Anreizes. Sprich mit deiner Leitung über Weiterbildungen oder zusätzliche Verantwortungsbereiche, die dich wachsen lassen und dir neue Perspektiven eröffnen."
+        }
+    },
+    "Interpersonelle Veränderungen": {
+        "examples": "Konflikte, Rollenverschiebungen, neue Kolleg:innen, Veränderung in Führung",
+        "color": "#A78AFF",
+        "bischof": "Bindungssystem - Sicherheit in sozialen Beziehungen",
+        "grawe": "Bedürfnisse: Bindung, Selbstwertschutz, Unlustvermeidung",
+        "flow": "Soziale Kompetenz im Umgang mit zwischenmenschlichen Herausforderungen",
+        "explanation": """Beziehungen im Team verändern sich, z. B. durch Konflikte, neue Kollegen oder Führungswechsel.
+
+Beispiel: Ein Konflikt zwischen Kollegen entsteht oder eine neue Leitungskraft übernimmt.
+
+Positiv erlebt: Du spürst, dass du gut damit umgehen kannst, weil du Erfahrung im Umgang mit Konflikten hast und weisst, wie man Spannungen aushält.
+
+Negativ erlebt: Du fühlst dich verunsichert und gestresst, weil du befürchtest, dass Konflikte auf dich zurückfallen, selbst wenn später alles ruhig bleibt.""",
+        "textbausteine": {
+            "Überforderung": "Zwischenmenschliche Spannungen oder Veränderungen können dein Gefühl nach Sicherheit und Vertrautem stark belasten, weil vertraute Signale fehlen. Achte darauf, Konflikte frühzeitig anzusprechen und dir, wenn nötig, Unterstützung von aussen zu holen – zum Beispiel durch Supervision oder Mediation. Klare Kommunikation schafft wieder Stabilität.",
+            "Ideale Passung": "Aktuell erlebst du ein stimmiges Miteinander im Team. Dein Neugier-System ist aktiv, weil der Austausch inspiriert, während dein Gefühl nach Sicherheit und Vertrautem dir Geborgenheit gibt. Nutze diese Phase, um Beziehungen bewusst zu stärken und eine stabile Basis für künftige Herausforderungen zu schaffen.",
+            "Unterforderung": "Wenn es zwischenmenschlich sehr ruhig ist, kann dein Neugier-System nach neuen Impulsen suchen. Vielleicht kannst du deine sozialen Fähigkeiten einbringen, indem du Kolleg:innen in schwierigen Situationen unterstützt oder Teamentwicklungsprojekte aktiv mitgestaltest."
+        }
+    }
+}
+
+# Fachlich fundierte Zeiterlebens-Skala
+TIME_PERCEPTION_SCALE = {
+    -3: {
+        "label": "Extreme Langeweile",
+        "description": "Zeit scheint stillzustehen - stark unterfordernde Situation",
+        "psychological_meaning": "Apathie, Desengagement, mangelnde Stimulation",
+        "bischof": "Sicherheitsüberschuss ohne Explorationsanreize",
+        "grawe": "Bedürfnisse nach Kompetenzerleben und Lustgewinn unerfüllt"
+    },
+    -2: {
+        "label": "Langeweile", 
+        "description": "Zeit vergeht langsam - deutliche Unterforderung",
+        "psychological_meaning": "Mangelnde Passung, suche nach Stimulation",
+        "bischof": "Explorationsdefizit bei hoher Vertrautheit",
+        "grawe": "Ungenügende Selbstwerterhöhung durch Unterforderung"
+    },
+    -1: {
+        "label": "Entspanntes Zeitgefühl",
+        "description": "Zeit vergeht ruhig und gleichmässig - leichte Unterforderung",
+        "psychological_meaning": "Entspannung bei guter Kontrolle",
+        "bischof": "Balance mit leichter Sicherheitsdominanz",
+        "grawe": "Grundkonsistenz mit Entwicklungpotenzial"
+    },
+    0: {
+        "label": "Normales Zeitgefühl",
+        "description": "Zeitwahrnehmung entspricht der Realzeit - optimale Passung",
+        "psychological_meaning": "Präsenz im Moment, gute Selbstregulation",
+        "bischof": "Ausgeglichene Bindung-Exploration-Balance",
+        "grawe": "Optimale Konsistenz aller Grundbedürfnisse"
+    },
+    1: {
+        "label": "Zeit fliesst positiv",
+        "description": "Zeit vergeht angenehm schnell - leichte positive Aktivierung",
+        "psychological_meaning": "Leichtes Flow-Erleben, engagierte Konzentration",
+        "bischof": "Leichte Explorationsdominanz bei guter Sicherheit",
+        "grawe": "Positive Aktivierung durch optimale Herausforderung"
+    },
+    2: {
+        "label": "Zeit rennt - Wachsamkeit",
+        "description": "Zeit vergeht sehr schnell - hohe Aktivierung, erste Stresssignale",
+        "psychological_meaning": "Erregungszunahme, benötigt bewusste Regulation",
+        "bischof": "Explorationsdominanz nähert sich Kapazitätsgrenze",
+        "grawe": "Kontrollbedürfnis wird aktiviert, Selbstwert möglicherweise gefährdet"
+    },
+    3: {
+        "label": "Stress - Zeit rast",
+        "description": "Zeitgefühl ist gestört - Überaktivierung, Kontrollverlust",
+        "psychological_meaning": "Stress, Überforderung, Regulationsbedarf",
+        "bischof": "Explorationssystem überlastet, Sicherheitsbedürfnis aktiviert",
+        "grawe": "Konsistenzstörung durch Überforderung der Bewältigungsressourcen"
+    }
+}
+
+# Tooltip-Beschreibungen für die Slider
+SKILL_DESCRIPTIONS = {
+    1: "Sehr geringe Fähigkeiten, brauche viel Unterstützung",
+    2: "Geringe Fähigkeiten, benötige Anleitung",  
+    3: "Grundlegende Fähigkeiten, noch unsicher",
+    4: "Durchschnittliche Fähigkeiten, komme zurecht",
+    5: "Gute Fähigkeiten, handle selbstständig",
+    6: "Sehr gute Fähigkeiten, kann andere anleiten",
+    7: "Exzellente Fähigkeiten, könnte andere schulen"
+}
+
+CHALLENGE_DESCRIPTIONS = {
+    1: "Keine Herausforderung, völlig routiniert",
+    2: "Minimale Herausforderung, fast automatisch",
+    3: "Leichte Herausforderung, wenig Anstrengung",
+    4: "Moderate Herausforderung, angemessene Anforderung",
+    5: "Deutliche Herausforderung, benötige Konzentration",
+    6: "Grosse Herausforderung, starke Beanspruchung",  
+    7: "Extreme Herausforderung, maximale Anstrengung"
+}
+
+TIME_DESCRIPTIONS = {
+    -3: "Extreme Langeweile: Zeit scheint stillzustehen",
+    -2: "Langeweile: Zeit vergeht sehr langsam",
+    -1: "Entspannt: Zeit vergeht ruhig und gleichmässig",
+    0: "Normal: Zeitwahrnehmung entspricht der Realzeit",
+    1: "Zeit fliesst: Zeit vergeht angenehm schnell",
+    2: "Zeit rennt: Zeit vergeht sehr schnell, erste Stresssignale",
+    3: "Stress"
+}
+
+# Kennzahlen, die für die Team-Analyse pro Domäne aggregiert werden
+TEAM_METRICS = ['skill', 'challenge', 'time_perception']
+# Kompaktes Team-DataFrame: Ratings als int8, Domänen als Kategorien
+RATING_DTYPE = np.int8
+DOMAIN_CATEGORIES = pd.CategoricalDtype(list(DOMAINS))
+# Gültige Wertebereiche (inklusive) für die Upload-Validierung
+RATING_RANGES = {'skill': (1, 7), 'challenge': (1, 7), 'time_perception': (-3, 3)}
+
+# Uploads im Thread-Pool parsen (False = serieller Fallback); None = Standard-Worker-Anzahl des Pools.
+# Es sind höchstens doppelt so viele Dateien gleichzeitig in Arbeit wie Worker
+PARALLEL_UPLOAD_PARSING = True
+UPLOAD_PARSE_WORKERS = None
+# So viele Bytes vom Dateianfang genügen für die Formaterkennung
+UPLOAD_SNIFF_BYTES = 4096
+
+# Team-Bundle: spaltenorientierte .npz-Datei mit den Exporten eines ganzen Teams
+TEAM_BUNDLE_VERSION = 1
+TEAM_BUNDLE_KEYS = ['format_version', 'domains', 'domain_codes', 'names', 'name_codes',
+                    'created_at', 'created_at_codes'] + TEAM_METRICS
+
+# Flow-Plot: Auflösung der gerenderten PNGs
+FLOW_PLOT_DPI = 150
+# Prozessweiter LRU-Cache für Berichtstexte (ohne Namen) pro Rating-Vektor; 0 = kein Cache.
+# Ein Eintrag belegt rund 50 KB (Emojis -> 4 Byte pro Zeichen), Treffer gibt es praktisch nur bei
+# wiederholten Reruns derselben Person - daher klein. Überschreibbar per Umgebungsvariable,
+# die vor dem Aufbau des Caches (Import von flowcore.reporting) gelesen wird.
+REPORT_CACHE_SIZE = int(os.environ.get("FLOWCORE_REPORT_CACHE_SIZE", 128))
+# Verzeichnis für den memory-mapped Cache aller 1715 Domänen-Interpretationen - pro Benutzer
+# (XDG-Cache, Rechte 0700), damit kein anderer lokaler Benutzer Texte unterschieben kann
+INTERPRETATION_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "flowcore")
+# Team-Analyse im Hintergrund: Worker-Threads (prozessweit) und Mindestabstand der Zwischenstände
+TEAM_ANALYSIS_WORKERS = 2
+TEAM_ANALYSIS_SNAPSHOT_SECONDS = 0.5
+
+DB_NAME = "flow_data.db"
+# Obergrenze für Platzhalter pro IN (...)-Abfrage (ältere SQLite-Versionen: 999)
+DB_MAX_VARIABLES = 900
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KIB = 8192
@@ -0,0 +1,461 @@
+"""Import und Export: maschinenlesbare Einzel-Exporte, Team-Bundles und Upload-Validierung"""
+import json
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from .config import (DOMAINS, DOMAIN_CATEGORIES, PARALLEL_UPLOAD_PARSING, RATING_DTYPE, RATING_RANGES,
+                     TEAM_BUNDLE_KEYS, TEAM_BUNDLE_VERSION, TEAM_METRICS, UPLOAD_PARSE_WORKERS, UPLOAD_SNIFF_BYTES)
+
+# ===== NEUE FUNKTIONEN FÜR EXPORT / IMPORT =====
+def build_machine_readable_payload(data, created_at=None):
+    """
+    Baut eine maschinenlesbare Repräsentation (dict) mit nur numerischen Werten.
+    created_at: ursprünglicher Zeitpunkt (ISO-String) bei Re-Exporten, sonst jetzt.
+    Struktur:
+    {
+      "Name": "Alex",
+      "created_at": "YYYY-MM-DDTHH:MM:SS",
+      "domains": {
+         "Team-Veränderungen": {"skill": 4, "challenge": 3, "time": 0},
+         ...
+      }
+    }
+    """
+    payload = {
+        "Name": data.get("Name", ""),
+        "created_at": created_at or datetime.now().isoformat(),
+        "domains": {}
+    }
+    for d in DOMAINS:
+        payload["domains"][d] = {
+            "skill": int(data.get(f"Skill_{d}", 4)),
+            "challenge": int(data.get(f"Challenge_{d}", 4)),
+            "time": int(data.get(f"Time_{d}", 0))
+        }
+    return payload
+
+def payload_to_data(payload):
+    """Umkehrung von build_machine_readable_payload: Payload -> current_data-Format (None bei fehlenden Domänen)"""
+    domains = payload.get("domains") if isinstance(payload, dict) else None
+    if not isinstance(domains, dict) or not all(d in domains for d in DOMAINS):
+        return None
+    data = {"Name": payload.get("Name", "")}
+    for d in DOMAINS:
+        vals = domains[d]
+        if not isinstance(vals, dict):
+            return None
+        data[f"Skill_{d}"] = vals.get("skill")
+        data[f"Challenge_{d}"] = vals.get("challenge")
+        data[f"Time_{d}"] = vals.get("time", vals.get("time_perception"))
+    return data
+
+def frame_to_payloads(df):
+    """Fasst normalisierte Upload-Zeilen (name, created_at, domain, ...) wieder zu Payloads pro Einreichung zusammen"""
+    payloads = []
+    for (name, created_at), group in df.groupby(['name', 'created_at'], sort=False, dropna=False, observed=True):
+        payloads.append({
+            "Name": "" if pd.isna(name) else name,
+            "created_at": created_at.isoformat() if isinstance(created_at, pd.Timestamp) else created_at,
+            "domains": {
+                row.domain: {"skill": int(row.skill), "challenge": int(row.challenge), "time": int(row.time_perception)}
+                for row in group.itertuples(index=False)
+            }
+        })
+    return payloads
+
+def export_machine_readable_json(data, created_at=None):
+    payload = build_machine_readable_payload(data, created_at)
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+def export_machine_readable_csv_bytes(data, created_at=None):
+    payload = build_machine_readable_payload(data, created_at)
+    rows = []
+    for d, vals in payload["domains"].items():
+        rows.append({
+            "Name": payload["Name"],
+            "created_at": payload["created_at"],
+            "domain": d,
+            "skill": vals["skill"],
+            "challenge": vals["challenge"],
+            "time": vals["time"]
+        })
+    df = pd.DataFrame(rows)
+    buf = BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8')
+    buf.seek(0)
+    return buf.getvalue()
+
+def detect_upload_format(filename, content):
+    """
+    Bestimmt das Format einer hochgeladenen Datei ohne Probe-Parsing:
+    erstes Nicht-Leerzeichen-Byte ('{' / '[' = JSON), Kopfzeile mit 'domain' (= CSV),
+    sonst die Dateiendung. Zip-Container sind Team-Bundles.
+    Gibt "json", "csv", "npz" oder None zurück.
+    """
+    head = content[:UPLOAD_SNIFF_BYTES]
+    if isinstance(head, str):
+        head = head.encode('utf-8')
+    if head.startswith(b'PK\x03\x04'):
+        # Zip-Container = Team-Bundle (.npz)
+        return "npz"
+    head = head.removeprefix(b'\xef\xbb\xbf').lstrip()
+    if head[:1] in (b'{', b'['):
+        return "json"
+    header_row = head.split(b'\n', 1)[0].lower()
+    if b'domain' in header_row and b',' in header_row:
+        return "csv"
+
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in (".json", ".csv", ".npz"):
+        return extension[1:]
+    return None
+
+def _parse_json_export(content):
+    """JSON-Export (build_machine_readable_payload) -> (DataFrame, Fehlermeldung)"""
+    try:
+        text = content.decode('utf-8-sig') if isinstance(content, (bytes, bytearray)) else content
+        obj = json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        return None, f"ungültiges JSON ({e})"
+    # validierung einfach: muss keys 'domains' haben
+    if not isinstance(obj, dict) or not isinstance(obj.get("domains"), dict):
+        return None, "JSON ohne 'domains'-Eintrag"
+    # Werte werden erst in validate_and_prepare_data geprüft - ungültige Zeilen landen dort in Quarantäne
+    try:
+        rows = []
+        for d, vals in obj["domains"].items():
+            rows.append({
+                "name": obj.get("Name", ""),
+                "created_at": obj.get("created_at", ""),
+                "domain": d,
+                "skill": vals.get("skill"),
+                "challenge": vals.get("challenge"),
+                "time_perception": vals.get("time", vals.get("time_perception", 0))
+            })
+    except AttributeError as e:
+        return None, f"ungültige Werte im JSON ({e})"
+    return pd.DataFrame(rows), None
+
+def _parse_csv_export(content):
+    """CSV-Export (export_machine_readable_csv_bytes) -> (DataFrame, Fehlermeldung)"""
+    try:
+        # pandas kann bytes direkt lesen
+        df = pd.read_csv(BytesIO(content), encoding='utf-8-sig')
+    except (UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        return None, f"ungültiges CSV ({e})"
+    # mögliche Spaltennamen normalisieren
+    df_columns = {c.lower(): c for c in df.columns}
+    if not {'domain', 'skill', 'challenge'}.issubset(df_columns):
+        return None, "CSV ohne Pflichtspalten domain, skill, challenge"
+    # Werte werden erst in validate_and_prepare_data geprüft - ungültige Zeilen landen dort in Quarantäne
+    df2 = pd.DataFrame()
+    df2['domain'] = df[df_columns['domain']]
+    # name optional
+    df2['name'] = df[df_columns['name']] if 'name' in df_columns else ""
+    df2['created_at'] = df[df_columns['created_at']] if 'created_at' in df_columns else ""
+    df2['skill'] = df[df_columns['skill']]
+    df2['challenge'] = df[df_columns['challenge']]
+    # zeit-spalte könnte 'time' oder 'time_perception' heissen
+    if 'time' in df_columns:
+        df2['time_perception'] = df[df_columns['time']]
+    elif 'time_perception' in df_columns:
+        df2['time_perception'] = df[df_columns['time_perception']]
+    else:
+        df2['time_perception'] = 0
+    return df2, None
+
+def export_team_bundle_bytes(frames):
+    """
+    Führt viele normalisierte Einzel-Exporte (DataFrames mit name, created_at, domain,
+    skill, challenge, time_perception) zu einem kompakten, spaltenorientierten
+    Team-Bundle zusammen (NumPy .npz, keine zusätzliche Abhängigkeit):
+    Domänen, Namen und Zeitstempel als Integer-Codes auf String-Tabellen,
+    skill/challenge/time_perception als int8.
+    """
+    frames = [f for f in frames if not f.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['name', 'created_at', 'domain'] + TEAM_METRICS)
+    extra_domains = sorted(set(df['domain'].dropna().astype(str)) - set(DOMAINS))
+    domain_codes = pd.Categorical(df['domain'].astype(str), categories=list(DOMAINS) + extra_domains).codes
+    name_codes, names = pd.factorize(df['name'].fillna("").astype(str))
+    created_at = df['created_at']
+    if pd.api.types.is_datetime64_any_dtype(created_at):
+        created_at = created_at.dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+    created_codes, created_at = pd.factorize(created_at.fillna("").astype(str))
+
+    buf = BytesIO()
+    np.savez_compressed(
+        buf,
+        format_version=np.array(TEAM_BUNDLE_VERSION),
+        domains=np.array(list(DOMAINS) + extra_domains, dtype=str),
+        domain_codes=domain_codes.astype(np.int8),
+        names=np.array(names, dtype=str),
+        name_codes=name_codes.astype(np.int32),
+        created_at=np.array(created_at, dtype=str),
+        created_at_codes=created_codes.astype(np.int32),
+        **{m: df[m].to_numpy(dtype=np.int8) for m in TEAM_METRICS}
+    )
+    return buf.getvalue()
+
+def parse_created_at(values):
+    """
+    created_at-Strings -> naives datetime64. Uploads mischen Zeitstempel mit und ohne
+    UTC-Offset; Werte mit Offset werden nach UTC umgerechnet, Werte ohne bleiben unverändert
+    (pandas lehnt gemischte Offsets sonst mit "Mixed timezones detected" ab).
+    Leere oder nicht lesbare Werte -> NaT.
+    """
+    parsed = pd.to_datetime(values.astype(object).replace("", None), errors='coerce', format='ISO8601', utc=True)
+    return parsed.dt.tz_localize(None)
+
+# Code-Spalte -> zugehörige String-Tabelle im Team-Bundle
+BUNDLE_CODE_TABLES = {'domain_codes': 'domains', 'name_codes': 'names', 'created_at_codes': 'created_at'}
+
+def load_team_bundle(content):
+    """
+    Lädt ein Team-Bundle (export_team_bundle_bytes) vollständig vektorisiert -
+    keine Python-Arbeit pro Zeile. Rückgabe: (DataFrame, None) oder (None, Fehlermeldung)
+    """
+    try:
+        with np.load(BytesIO(content), allow_pickle=False) as bundle:
+            arrays = {key: bundle[key] for key in TEAM_BUNDLE_KEYS}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        return None, f"ungültiges Team-Bundle ({e})"
+    if int(arrays['format_version']) > TEAM_BUNDLE_VERSION:
+        return None, f"Team-Bundle-Version {int(arrays['format_version'])} wird nicht unterstützt"
+
+    row_keys = ['domain_codes', 'name_codes', 'created_at_codes'] + TEAM_METRICS
+    if any(arrays[key].ndim != 1 for key in row_keys + list(BUNDLE_CODE_TABLES.values())):
+        return None, "ungültiges Team-Bundle (Spalten sind keine Vektoren)"
+    row_count = len(arrays['domain_codes'])
+    if any(len(arrays[key]) != row_count for key in row_keys):
+        return None, "ungültiges Team-Bundle (Spalten unterschiedlich lang)"
+    # Codes müssen auf einen Eintrag ihrer Tabelle zeigen - negative Codes würden sonst
+    # stillschweigend von hinten indizieren, zu grosse mit IndexError abbrechen
+    for code_key, table_key in BUNDLE_CODE_TABLES.items():
+        codes = arrays[code_key]
+        if codes.dtype.kind not in 'iu' or (row_count and (codes.min() < 0 or codes.max() >= len(arrays[table_key]))):
+            return None, f"ungültiges Team-Bundle ({code_key} ausserhalb der Tabelle {table_key})"
+    try:
+        df = pd.DataFrame({
+            'name': pd.Categorical.from_codes(arrays['name_codes'], categories=arrays['names']),
+            # Zeitstempel nur einmal pro eindeutigem Wert parsen, dann per Code verteilen
+            'created_at': parse_created_at(pd.Series(arrays['created_at'])).to_numpy()[arrays['created_at_codes']],
+            'domain': pd.Categorical.from_codes(arrays['domain_codes'], categories=arrays['domains']),
+            **{m: arrays[m] for m in TEAM_METRICS}
+        })
+    except ValueError as e:
+        return None, f"ungültiges Team-Bundle ({e})"
+    return df, None
+
+def parse_uploaded_report_file(uploaded_file):
+    """
+    Bringt eine hochgeladene Datei (JSON oder CSV) in ein standardisiertes DataFrame.
+    Erwartet Format wie export_machine_readable_payload bzw. CSV mit columns:
+    Name, created_at, domain, skill, challenge, time
+    Das Format wird vorab erkannt (detect_upload_format), die Datei geht direkt an genau einen Parser.
+    Rückgabe: (DataFrame, None) oder (None, Fehlermeldung)
+    """
+    content = uploaded_file.read()
+    upload_format = detect_upload_format(uploaded_file.name, content)
+    if upload_format == "json":
+        return _parse_json_export(content)
+    if upload_format == "csv":
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return _parse_csv_export(content)
+    if upload_format == "npz":
+        return load_team_bundle(content)
+    return None, "unbekanntes Format"
+
+def validate_uploaded_dataframe(df):
+    """
+    Vektorisierte Prüfung aller Zeilen in einem Durchgang: Wertebereiche
+    (skill/challenge 1-7, time_perception -3..3, jeweils ganzzahlig) und
+    Domänen-Zugehörigkeit zu DOMAINS.
+    Rückgabe: (coerced, violations) - coerced enthält die numerisch konvertierten
+    Ratings (nicht lesbar -> NaN), violations ist eine bool-Maske pro Zeile und Regel.
+    """
+    coerced = pd.DataFrame(index=df.index)
+    violations = pd.DataFrame(index=df.index)
+    for col, (low, high) in RATING_RANGES.items():
+        values = pd.to_numeric(df[col], errors='coerce') if col in df.columns else pd.Series(0, index=df.index)
+        coerced[col] = values
+        violations[col] = ~(values.between(low, high) & (values == np.floor(values)))
+    violations['domain'] = ~df['domain'].isin(DOMAINS)
+    return coerced, violations
+
+def parse_and_normalize_upload(uploaded_file):
+    """Parst eine Datei und bringt sie auf die Standardspalten -> (DataFrame, Fehlermeldung)"""
+    parsed, error = parse_uploaded_report_file(uploaded_file)
+    if parsed is None:
+        return None, error
+    
+    # normalisiere column names
+    parsed.columns = [c.lower() for c in parsed.columns]
+    
+    # ensure correct columns
+    if 'time_perception' not in parsed.columns and 'time' in parsed.columns:
+        parsed = parsed.rename(columns={'time': 'time_perception'})
+    
+    # fill missing columns
+    for req in ['name', 'domain', 'skill', 'challenge', 'time_perception']:
+        if req not in parsed.columns:
+            if req in ['name', 'domain']:
+                parsed[req] = ""
+            else:
+                parsed[req] = 0
+    
+    # Werte werden nicht mehr hart nach int gecastet - validate_and_prepare_data prüft
+    # und konvertiert vektorisiert und nimmt ungültige Zeilen in Quarantäne
+    
+    return parsed, None
+
+def iter_parsed_uploads(uploaded_files, parallel=None):
+    """
+    Generator: parst die Dateien und liefert für jede Datei (Dateiname, normalisiertes DataFrame,
+    Fehlermeldung) - bei nicht lesbaren Dateien ist das DataFrame None -, immer in der
+    Reihenfolge der Uploads. Mit parallel=True (Standard: PARALLEL_UPLOAD_PARSING) werden die
+    Dateien in einem Thread-Pool geparst, parallel=False parst seriell.
+    """
+    if parallel is None:
+        parallel = PARALLEL_UPLOAD_PARSING
+    uploaded_files = list(uploaded_files)
+
+    if parallel and len(uploaded_files) > 1:
+        # Standard-Worker-Anzahl wie bei ThreadPoolExecutor
+        workers = UPLOAD_PARSE_WORKERS or min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parsed_uploads = _map_bounded(executor, parse_and_normalize_upload, uploaded_files, 2 * workers)
+            try:
+                for f, (parsed, error) in zip(uploaded_files, parsed_uploads):
+                    yield f.name, parsed, error
+            finally:
+                parsed_uploads.close()
+    else:
+        for f in uploaded_files:
+            yield (f.name, *parse_and_normalize_upload(f))
+
+def _map_bounded(executor, fn, items, window):
+    """
+    Wie executor.map (Ergebnisse in Eingabereihenfolge), reicht aber höchstens window
+    Aufgaben gleichzeitig ein: geparste Dateien stauen sich nicht im Speicher, wenn der
+    Verbraucher langsamer ist, und beim Schliessen des Generators (Abbruch) werden die
+    noch wartenden Aufgaben verworfen.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def iter_uploaded_file_frames(uploaded_files, errors, parallel=None):
+    """
+    Generator wie iter_parsed_uploads, liefert aber nur die lesbaren Dateien als
+    (Dateiname, normalisiertes DataFrame). Nicht lesbare Dateien werden in errors vermerkt.
+    """
+    parsed_uploads = iter_parsed_uploads(uploaded_files, parallel)
+    try:
+        for source, parsed, error in parsed_uploads:
+            if parsed is None:
+                errors.append(f"{source}: {error}")
+                continue
+            yield source, parsed
+    finally:
+        parsed_uploads.close()
+
+def aggregate_uploaded_files_to_df(uploaded_files, quarantine=None):
+    """Nimmt mehrere Dateien und erzeugt ein concatenated, validiertes DataFrame (kompaktes Format)"""
+    errors = []
+    frames = list(iter_validated_upload_frames(uploaded_files, errors, quarantine))
+    
+    if frames:
+        return to_compact_team_frame(pd.concat(frames, ignore_index=True)), errors
+    else:
+        return pd.DataFrame(), errors
+
+def iter_validated_upload_frames(uploaded_files, errors, quarantine=None):
+    """
+    Generator: validierte Einzel-DataFrames der Uploads (z.B. für accumulate_team_chunk oder Team-Bundles).
+    Ungültige Zeilen werden an die Liste quarantine angehängt (falls übergeben).
+    """
+    for source, frame in iter_uploaded_file_frames(uploaded_files, errors):
+        frame, error_msg, quarantined = validate_and_prepare_data(frame)
+        if quarantine is not None and not quarantined.empty:
+            quarantine.append(quarantined)
+        if error_msg:
+            errors.append(f"{source}: Datenvalidierungsfehler: {error_msg}")
+            continue
+        yield frame
+
+# ===== VALIDIERUNG UND KOMPAKTES TEAM-FORMAT =====
+def validate_and_prepare_data(df):
+    """
+    Zentrale Datenvalidierung und -vorbereitung.
+    Ungültige Zeilen werden nicht mehr auf 0 gesetzt, sondern in Quarantäne genommen.
+    Rückgabe: (kompaktes DataFrame der gültigen Zeilen, Fehlermeldung, Quarantäne-Zeilen)
+    """
+    if df.empty:
+        return None, "Keine Daten verfügbar", pd.DataFrame()
+    
+    # Spalten-Normalisierung
+    df.columns = df.columns.str.lower()
+    
+    # Pflichtspalten prüfen
+    required = ['domain', 'skill', 'challenge']
+    if not all(col in df.columns for col in required):
+        return None, "Fehlende Pflichtspalten", pd.DataFrame()
+    
+    coerced, violations = validate_uploaded_dataframe(df)
+    invalid = violations.any(axis=1)
+
+    quarantined = df[invalid].copy()
+    if invalid.any():
+        # Begründung pro Zeile, z.B. "skill, domain"
+        quarantined['verstoss'] = violations[invalid].dot(violations.columns + ", ").str.rstrip(", ")
+
+    valid = df[~invalid].copy()
+    if valid.empty:
+        return None, "Keine gültigen Zeilen", quarantined
+    for col in RATING_RANGES:
+        valid[col] = coerced.loc[~invalid, col]
+    return to_compact_team_frame(valid), None, quarantined
+
+def to_compact_team_frame(df):
+    """
+    Einheitliches, speichersparendes Format für alle Team-Funktionen:
+    - name: categorical
+    - created_at: naives datetime64, Offsets nach UTC umgerechnet (nicht lesbare Zeitstempel -> NaT)
+    - domain: categorical mit den DOMAINS-Schlüsseln als Kategorien (Unbekanntes -> NaN)
+    - skill, challenge, time_perception: int8
+    Erwartet bereits numerische, ganzzahlige Ratings im int8-Bereich.
+    """
+    index = df.index
+    name = df['name'] if 'name' in df.columns else pd.Series("", index=index)
+    if not isinstance(name.dtype, pd.CategoricalDtype):
+        name = name.fillna("").astype(str).astype('category')
+    created_at = df['created_at'] if 'created_at' in df.columns else pd.Series(pd.NaT, index=index)
+    if isinstance(created_at.dtype, pd.DatetimeTZDtype):
+        created_at = created_at.dt.tz_convert(None)
+    elif not pd.api.types.is_datetime64_any_dtype(created_at):
+        created_at = parse_created_at(created_at)
+
+    compact = pd.DataFrame({
+        'name': name,
+        'created_at': created_at,
+        'domain': pd.Categorical(df['domain'], dtype=DOMAIN_CATEGORIES),
+    }, index=index)
+    for m in TEAM_METRICS:
+        compact[m] = df[m].astype(RATING_DTYPE) if m in df.columns else RATING_DTYPE(0)
+    return compact.reset_index(drop=True)
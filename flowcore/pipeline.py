@@ -0,0 +1,160 @@
+"""
+Team-Analyse im Hintergrund: Parsen, Validieren, Aggregieren und Diagramm laufen in einem
+Worker-Thread. Der Job-Zustand (ein dict) enthält Fortschritt pro Stufe und Zwischenergebnisse,
+die eine Oberfläche jederzeit anzeigen kann; ein Abbruch gibt den Worker an der nächsten
+Datei frei.
+"""
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import TEAM_ANALYSIS_SNAPSHOT_SECONDS, TEAM_ANALYSIS_WORKERS
+from .exchange import iter_parsed_uploads, validate_and_prepare_data
+from .plotting import TEAM_PLOT_LABELS, flow_plot_spec, render_flow_points_png, team_plot_points
+from .team import (accumulate_team_chunk, build_cbi_analysis, finalize_team_accumulator, new_team_accumulator,
+                   team_overview)
+
+TEAM_ANALYSIS_STAGES = {
+    'parse': "Dateien einlesen",
+    'validate': "Daten validieren",
+    'aggregate': "Aggregieren",
+    'plot': "Diagramm und CBI",
+}
+
+def team_flow_chart(overview, client_charts):
+    """Team-Flow-Plot: Vega-Lite-Spezifikation (client_charts) oder PNG-Bytes"""
+    domains = list(overview.index)
+    points = team_plot_points(overview)
+    if client_charts:
+        return flow_plot_spec(TEAM_PLOT_LABELS, domains, points)
+    return render_flow_points_png(TEAM_PLOT_LABELS, domains, points)
+
+def prepare_team_results(team_aggregates, client_charts):
+    """Übersicht, Flow-Plot und CBI-Analyse für fertige Team-Aggregate"""
+    overview = team_overview(team_aggregates['domain_stats'])
+    return {
+        'overview': overview,
+        'chart': team_flow_chart(overview, client_charts),
+        'client_charts': client_charts,
+        'cbi': build_cbi_analysis(
+            team_aggregates['domain_stats'],
+            team_aggregates['zone_counts'],
+            team_aggregates['time_counts'],
+            team_aggregates['participant_count']
+        ),
+    }
+
+# ===== HINTERGRUND-JOB =====
+@functools.cache
+def get_team_analysis_executor():
+    """Prozessweiter Thread-Pool für Team-Analysen (Uploads liegen im Speicher - kein Pickling nötig)"""
+    return ThreadPoolExecutor(max_workers=TEAM_ANALYSIS_WORKERS, thread_name_prefix="team-analyse")
+
+def new_team_analysis_job(file_count):
+    """
+    Leerer Job-Zustand; progress zählt pro Stufe (erledigt, gesamt), frames sammelt die
+    validierten Einzel-DataFrames für Team-Bundle und DB-Import
+    """
+    return {
+        'status': 'queued',
+        'progress': {'parse': (0, file_count), 'validate': (0, file_count),
+                     'aggregate': (0, file_count), 'plot': (0, 1)},
+        'errors': [],
+        'quarantine': [],
+        'frames': [],
+        'rows': 0,
+        'aggregates': None,
+        'results': None,
+        'failure': None,
+        'cancel_event': threading.Event(),
+        'future': None,
+    }
+
+def run_team_analysis(job, uploaded_files, client_charts):
+    """
+    Führt die Team-Analyse für job aus (im Worker-Thread). Zwischenstände der Aggregate
+    werden höchstens alle TEAM_ANALYSIS_SNAPSHOT_SECONDS in job['aggregates'] veröffentlicht,
+    am Ende stehen die Aggregate und prepare_team_results in job['aggregates'] / job['results'].
+    Fehler landen in job['failure'] statt den Worker-Thread zu beenden.
+    """
+    if job['cancel_event'].is_set():
+        job['status'] = 'cancelled'
+        return job
+    job['status'] = 'running'
+    try:
+        completed = _run_team_analysis_stages(job, list(uploaded_files), client_charts)
+    except Exception as e:
+        job['failure'] = str(e)
+        job['status'] = 'failed'
+        return job
+    job['status'] = 'done' if completed else 'cancelled'
+    return job
+
+def _run_team_analysis_stages(job, uploaded_files, client_charts):
+    """Parsen, Validieren, Aggregieren pro Datei, danach Diagramm und CBI -> False bei Abbruch"""
+    cancel_event = job['cancel_event']
+    total = len(uploaded_files)
+    accumulator = new_team_accumulator()
+    last_snapshot = time.monotonic()
+    parsed_uploads = iter_parsed_uploads(uploaded_files)
+    try:
+        # done zählt jede Datei, sobald sie eine Stufe verlassen hat - auch nicht lesbare
+        for done, (source, frame, read_error) in enumerate(parsed_uploads, start=1):
+            if frame is None:
+                job['errors'].append(f"{source}: {read_error}")
+            job['progress']['parse'] = (done, total)
+            if cancel_event.is_set():
+                return False
+
+            if frame is not None:
+                frame, error_msg, quarantined = validate_and_prepare_data(frame)
+                if not quarantined.empty:
+                    job['quarantine'].append(quarantined)
+                if error_msg:
+                    job['errors'].append(f"{source}: Datenvalidierungsfehler: {error_msg}")
+            job['progress']['validate'] = (done, total)
+            if cancel_event.is_set():
+                return False
+
+            if frame is not None:
+                accumulate_team_chunk(accumulator, frame)
+                job['frames'].append(frame)
+                job['rows'] = accumulator['rows']
+            job['progress']['aggregate'] = (done, total)
+            if time.monotonic() - last_snapshot >= TEAM_ANALYSIS_SNAPSHOT_SECONDS:
+                job['aggregates'] = finalize_team_accumulator(accumulator)
+                last_snapshot = time.monotonic()
+    finally:
+        # Schliesst den Parse-Generator - noch nicht gestartete Dateien werden verworfen
+        parsed_uploads.close()
+
+    team_aggregates = finalize_team_accumulator(accumulator)
+    job['aggregates'] = team_aggregates
+    if cancel_event.is_set():
+        return False
+    if not team_aggregates['domain_stats'].empty:
+        job['results'] = prepare_team_results(team_aggregates, client_charts)
+    job['progress']['plot'] = (1, 1)
+    return True
+
+def start_team_analysis(uploaded_files, client_charts):
+    """Startet run_team_analysis im Thread-Pool und gibt den Job-Zustand sofort zurück"""
+    uploaded_files = list(uploaded_files)
+    job = new_team_analysis_job(len(uploaded_files))
+    job['future'] = get_team_analysis_executor().submit(run_team_analysis, job, uploaded_files, client_charts)
+    return job
+
+def cancel_team_analysis(job):
+    """
+    Bricht den Job ab: ein noch wartender Job wird aus der Warteschlange genommen, ein laufender
+    hört nach der aktuellen Datei auf und gibt den Worker frei.
+    """
+    job['cancel_event'].set()
+    if job['future'] is not None and job['future'].cancel():
+        job['status'] = 'cancelled'
+    return job
+
+def team_analysis_finished(job):
+    """True, wenn der Job abgeschlossen, abgebrochen oder fehlgeschlagen ist"""
+    return job['status'] in ('done', 'cancelled', 'failed')
@@ -0,0 +1,226 @@
+"""Flow-Plots: Matplotlib-Figuren, geblittete PNGs und Vega-Lite-Spezifikationen"""
+import functools
+import threading
+from io import BytesIO
+
+import numpy as np
+
+from .config import DOMAINS, FLOW_PLOT_DPI
+# Matplotlib und PIL werden erst in den Plot-Funktionen importiert - ein Kaltstart ohne
+# Server-Diagramm zahlt deren Importkosten nicht
+
+# Statische Geometrie des Flow-Kanals - einmal pro Prozess berechnet
+FLOW_CHANNEL_X = np.linspace(1, 7, 100)
+FLOW_CHANNEL_LOWER = np.maximum(FLOW_CHANNEL_X - 1, 1)
+FLOW_CHANNEL_UPPER = np.minimum(FLOW_CHANNEL_X + 1, 7)
+
+# (Titel, x-Beschriftung, y-Beschriftung) der beiden Flow-Plots
+INDIVIDUAL_PLOT_LABELS = ('Flow-Kanal nach Csikszentmihalyi', 'Fähigkeiten (1-7)', 'Herausforderungen (1-7)')
+TEAM_PLOT_LABELS = ('Team-Analyse: Flow-Kanal nach Csikszentmihalyi',
+                    'Durchschnittliche Fähigkeiten (1-7)', 'Durchschnittliche Herausforderungen (1-7)')
+
+def draw_flow_channel(ax, labels):
+    """Zeichnet den statischen Teil eines Flow-Plots: Kanal-Flächen, Diagonale, Achsen und Gitter"""
+    title, xlabel, ylabel = labels
+    ax.fill_between(FLOW_CHANNEL_X, FLOW_CHANNEL_LOWER, FLOW_CHANNEL_UPPER, color='lightgreen', alpha=0.3, label='Flow-Kanal')
+    ax.fill_between(FLOW_CHANNEL_X, 1, FLOW_CHANNEL_LOWER, color='lightgray', alpha=0.3, label='Apathie')
+    ax.fill_between(FLOW_CHANNEL_X, FLOW_CHANNEL_UPPER, 7, color='lightcoral', alpha=0.3, label='Angst/Überlastung')
+    ax.set_xlim(0.5, 7.5)
+    ax.set_ylim(0.5, 7.5)
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.plot([1, 7], [1, 7], 'k--', alpha=0.5, label='Ideales Flow-Verhältnis')
+    ax.grid(True, alpha=0.3)
+
+def draw_flow_points(ax, points):
+    """
+    Zeichnet die Domänen-Punkte samt Beschriftungen und gibt die Artists zurück.
+    points: Liste von (skill, challenge, farbe, zeit-beschriftung, domänen-beschriftung oder None)
+    """
+    artists = []
+    for x, y, color, time_label, domain_label in points:
+        artists.append(ax.scatter(x, y, c=color, s=200, alpha=0.9, edgecolors='white', linewidths=1.5))
+        artists.append(ax.annotate(time_label, (x+0.1, y+0.1), fontsize=9, fontweight='bold'))
+        if domain_label:
+            artists.append(ax.annotate(domain_label, (x+0.15, y-0.25), fontsize=9, alpha=0.8))
+    return artists
+
+def add_flow_legend(ax, legend_domains):
+    """Legende mit Kanal-Flächen, Diagonale und einem Eintrag pro Domäne"""
+    for domain in legend_domains:
+        ax.scatter([], [], c=DOMAINS[domain]['color'], s=200, alpha=0.9,
+                   edgecolors='white', linewidths=1.5, label=domain)
+    ax.legend(loc='upper left', bbox_to_anchor=(1, 1))
+
+def individual_plot_points(data, domain_colors):
+    return [
+        (data.get(f"Skill_{d}", 4), data.get(f"Challenge_{d}", 4), domain_colors[d], f"{data.get(f'Time_{d}', 0)}", d)
+        for d in DOMAINS
+    ]
+
+def team_plot_points(domain_stats):
+    return [
+        (domain_stats.loc[domain, 'skill'], domain_stats.loc[domain, 'challenge'], DOMAINS[domain]['color'],
+         f"{domain_stats.loc[domain, 'time_perception']:.1f}", None)
+        for domain in domain_stats.index
+    ]
+
+def create_flow_plot(data, domain_colors):
+    """Vollständige Matplotlib-Figur des persönlichen Flow-Plots (z.B. für Exporte)"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(12, 8))
+    draw_flow_channel(ax, INDIVIDUAL_PLOT_LABELS)
+    draw_flow_points(ax, individual_plot_points(data, domain_colors))
+    add_flow_legend(ax, list(DOMAINS))
+    plt.tight_layout()
+    return fig
+
+def create_team_flow_plot(domain_stats):
+    """Vollständige Matplotlib-Figur des Team-Flow-Plots (z.B. für Exporte)"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(12, 8))
+    draw_flow_channel(ax, TEAM_PLOT_LABELS)
+    draw_flow_points(ax, team_plot_points(domain_stats))
+    add_flow_legend(ax, list(domain_stats.index))
+    plt.tight_layout()
+    return fig
+
+@functools.cache
+def get_flow_plot_background(labels, legend_domains):
+    """
+    Rendert den statischen Hintergrund (Kanal, Achsen, Gitter, Legende) einmal pro Prozess
+    in eine Agg-Figur und merkt sich das Raster. Liefert (figure, axes, raster, lock).
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=(12, 8), dpi=FLOW_PLOT_DPI)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    draw_flow_channel(ax, labels)
+    add_flow_legend(ax, legend_domains)
+    fig.tight_layout()
+    canvas.draw()
+    # Die Figur wird von allen Sessions geteilt - Zeichnen nur unter Lock
+    return fig, ax, canvas.copy_from_bbox(fig.bbox), threading.Lock()
+
+def render_flow_points_png(labels, legend_domains, points):
+    """Setzt nur die Domänen-Punkte auf den gecachten Hintergrund (Blitting) und liefert PNG-Bytes"""
+    from PIL import Image
+    fig, ax, background, lock = get_flow_plot_background(labels, tuple(legend_domains))
+    with lock:
+        fig.canvas.restore_region(background)
+        artists = draw_flow_points(ax, points)
+        for artist in artists:
+            ax.draw_artist(artist)
+        image = np.array(fig.canvas.buffer_rgba())
+        for artist in artists:
+            artist.remove()
+    buf = BytesIO()
+    # Schnelle PNG-Kompression - die Kodierung ist sonst teurer als das Zeichnen der Punkte
+    Image.fromarray(image).save(buf, format='png', dpi=(FLOW_PLOT_DPI, FLOW_PLOT_DPI), compress_level=1)
+    return buf.getvalue()
+
+def flow_plot_ratings(data):
+    """Cache-Schlüssel für den Flow-Plot: (skill, challenge, time) pro Domäne in DOMAINS-Reihenfolge"""
+    return tuple(
+        (int(data.get(f"Skill_{d}", 4)), int(data.get(f"Challenge_{d}", 4)), int(data.get(f"Time_{d}", 0)))
+        for d in DOMAINS
+    )
+
+def render_flow_plot_png(ratings):
+    """
+    Rendert den Flow-Plot für ein Rating-Tupel (flow_plot_ratings) als PNG-Bytes.
+    Es werden nur die Punkte auf den vorgerenderten Hintergrund gesetzt.
+    """
+    data = {}
+    for d, (skill, challenge, time_val) in zip(DOMAINS, ratings):
+        data.update({f"Skill_{d}": skill, f"Challenge_{d}": challenge, f"Time_{d}": time_val})
+    domain_colors = {domain: config["color"] for domain, config in DOMAINS.items()}
+    return render_flow_points_png(INDIVIDUAL_PLOT_LABELS, list(DOMAINS), individual_plot_points(data, domain_colors))
+
+# ===== CLIENTSEITIGE DIAGRAMME (VEGA-LITE) =====
+# Knickpunkte der Kanalgrenzen - zwischen ihnen sind die Grenzen linear, mehr Punkte braucht der Browser nicht
+FLOW_CHANNEL_BREAKPOINTS = (1, 2, 6, 7)
+FLOW_BAND_STYLES = (('Flow-Kanal', 'lightgreen'), ('Apathie', 'lightgray'), ('Angst/Überlastung', 'lightcoral'))
+
+def flow_band_values():
+    """Kanal-Flächen als kompakte Datenzeilen (x, y, y2, band) für eine Vega-Lite-Area-Ebene"""
+    values = []
+    for x in FLOW_CHANNEL_BREAKPOINTS:
+        lower, upper = max(x - 1, 1), min(x + 1, 7)
+        values.append({'x': x, 'y': lower, 'y2': upper, 'band': 'Flow-Kanal'})
+        values.append({'x': x, 'y': 1, 'y2': lower, 'band': 'Apathie'})
+        values.append({'x': x, 'y': upper, 'y2': 7, 'band': 'Angst/Überlastung'})
+    return values
+
+def flow_plot_spec(labels, legend_domains, points):
+    """
+    Vega-Lite-Spezifikation des Flow-Plots - gleiche Geometrie wie draw_flow_channel/draw_flow_points,
+    gerendert wird aber im Browser. points wie bei draw_flow_points.
+    """
+    title, xlabel, ylabel = labels
+    color_domain = [band for band, _ in FLOW_BAND_STYLES] + list(legend_domains)
+    color_range = [color for _, color in FLOW_BAND_STYLES] + [DOMAINS[d]['color'] for d in legend_domains]
+    color = {'scale': {'domain': color_domain, 'range': color_range}, 'legend': {'title': None}}
+    axis_scale = {'domain': [0.5, 7.5], 'nice': False}
+    x = {'field': 'x', 'type': 'quantitative', 'scale': axis_scale, 'title': xlabel}
+    y = {'field': 'y', 'type': 'quantitative', 'scale': axis_scale, 'title': ylabel}
+
+    point_values = [
+        {'x': float(px), 'y': float(py), 'domain': domain_label or name, 'zeit': time_label}
+        for (px, py, _, time_label, domain_label), name in zip(points, legend_domains)
+    ]
+    domain_labels = [
+        {'x': float(px), 'y': float(py), 'domain': domain_label}
+        for px, py, _, _, domain_label in points if domain_label
+    ]
+
+    layers = [
+        {'data': {'values': flow_band_values()}, 'mark': {'type': 'area', 'opacity': 0.3},
+         'encoding': {'x': x, 'y': y, 'y2': {'field': 'y2'}, 'color': {'field': 'band', **color}}},
+        {'data': {'values': [{'x': 1, 'y': 1}, {'x': 7, 'y': 7}]},
+         'mark': {'type': 'line', 'color': 'black', 'strokeDash': [6, 4], 'opacity': 0.5},
+         'encoding': {'x': x, 'y': y}},
+        {'data': {'values': point_values},
+         'mark': {'type': 'point', 'filled': True, 'size': 200, 'opacity': 0.9, 'stroke': 'white', 'strokeWidth': 1.5},
+         'encoding': {'x': x, 'y': y, 'color': {'field': 'domain', **color},
+                      'tooltip': [{'field': 'domain', 'title': 'Domäne'},
+                                  {'field': 'x', 'title': 'Fähigkeiten'},
+                                  {'field': 'y', 'title': 'Herausforderungen'},
+                                  {'field': 'zeit', 'title': 'Zeitwahrnehmung'}]}},
+        {'data': {'values': point_values},
+         'mark': {'type': 'text', 'align': 'left', 'dx': 8, 'dy': -8, 'fontWeight': 'bold'},
+         'encoding': {'x': x, 'y': y, 'text': {'field': 'zeit'}}},
+    ]
+    if domain_labels:
+        layers.append({'data': {'values': domain_labels},
+                       'mark': {'type': 'text', 'align': 'left', 'dx': 10, 'dy': 16, 'opacity': 0.8},
+                       'encoding': {'x': x, 'y': y, 'text': {'field': 'domain'}}})
+
+    return {'title': title, 'height': 500, 'layer': layers}
+
+def time_distribution_spec(time_data):
+    """Vega-Lite-Spezifikation der Zeitwahrnehmungs-Verteilung (Balkendiagramm)"""
+    return {
+        'title': 'Verteilung der Zeitwahrnehmung im Team',
+        'height': 350,
+        'data': {'values': [{'zeit': int(k), 'anzahl': int(v)} for k, v in time_data.items()]},
+        'mark': {'type': 'bar', 'color': 'skyblue'},
+        'encoding': {
+            'x': {'field': 'zeit', 'type': 'ordinal', 'title': 'Zeitwahrnehmung (-3 bis +3)', 'axis': {'labelAngle': 0}},
+            'y': {'field': 'anzahl', 'type': 'quantitative', 'title': 'Anzahl Bewertungen'},
+            'tooltip': [{'field': 'zeit', 'title': 'Zeitwahrnehmung'}, {'field': 'anzahl', 'title': 'Anzahl'}],
+        },
+    }
+
+def create_time_distribution_plot(time_data):
+    """Vollständige Matplotlib-Figur der Zeitwahrnehmungs-Verteilung (z.B. für Exporte)"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(time_data.keys(), time_data.values(), color='skyblue')
+    ax.set_xlabel('Zeitwahrnehmung (-3 bis +3)')
+    ax.set_ylabel('Anzahl Bewertungen')
+    ax.set_title('Verteilung der Zeitwahrnehmung im Team')
+    ax.grid(True, alpha=0.3)
+    return fig
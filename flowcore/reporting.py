@@ -0,0 +1,648 @@
+"""Persönlicher Textbericht aus den Ratings einer Einzelanalyse"""
+import functools
+import hashlib
+import mmap
+import numbers
+import os
+import tempfile
+from types import MappingProxyType
+
+import numpy as np
+
+from .config import DOMAINS, INTERPRETATION_CACHE_DIR, REPORT_CACHE_SIZE, TIME_PERCEPTION_SCALE
+from .scoring import FLOW_ZONE_TABLE, FLOW_ZONES, RATING_MAX, RATING_MIN, get_cached_flow
+
+# Basis-Empfehlungen pro Zeitwert
+TIME_RECOMMENDATIONS = {
+    -3: [
+        "Dringend neue Herausforderungen suchen",
+        "Tätigkeitsprofil erweitern oder anpassen",
+        "Supervision zur Motivationsklärung nutzen"
+    ],
+    -2: [
+        "Zusätzliche Aufgaben übernehmen",
+        "Eigene Projekte initiieren",
+        "Weiterbildungsmöglichkeiten prüfen"
+    ],
+    -1: [
+        "Leichte Erweiterung der Kompetenzen",
+        "Neue Aspekte in vertraute Aufgaben einbringen",
+        "Mentoring für andere überlegen"
+    ],
+    0: [
+        "Aktuelle Balance bewusst beibehalten",
+        "Erfolgsfaktoren dokumentieren und transferieren",
+        "Als Multiplikator für andere wirken"
+    ],
+    1: [
+        "Idealzustand - bewusst geniessen und stabilisieren",
+        "Erfahrungen reflektieren und generalisieren",
+        "Als Best Practice teilen"
+    ],
+    2: [
+        "Arbeitspensen kritisch prüfen",
+        "Delegationsmöglichkeiten ausloten",
+        "Entlastung und Pausengestaltung optimieren"
+    ],
+    3: [
+        "Akute Entlastung notwendig",
+        "Supervision oder Coaching in Anspruch nehmen",
+        "Gesundheitliche Folgen beachten und priorisieren"
+    ]
+}
+
+# Domänenspezifische Zusatzempfehlungen
+DOMAIN_RECOMMENDATIONS = {
+    "Team-Veränderungen": [
+        "Kommunikation im Team intensivieren",
+        "Rollenklarheit herstellen",
+        "Unterstützungsnetzwerke aufbauen"
+    ],
+    "Veränderungen im Betreuungsbedarf der Klient:innen": [
+        "Fallsupervision nutzen",
+        "Kollegiale Beratung etablieren",
+        "Entlastung durch Teamarbeit"
+    ],
+    "Prozess- oder Verfahrensänderungen": [
+        "Schulungen und Einarbeitung optimieren",
+        "Feedback-Prozesse etablieren",
+        "Pilotphasen einplanen"
+    ],
+    "Kompetenzanforderungen / neue Aufgaben": [
+        "Lernziele klar definieren",
+        "Lernpartnerschaften bilden",
+        "Praxistransfer sicherstellen"
+    ],
+    "Interpersonelle Veränderungen": [
+        "Konfliktgespräche führen",
+        "Teamtage zur Klärung nutzen",
+        "Externe Moderation in Anspruch nehmen"
+    ]
+}
+
+def _render_recommendations(time_val, domain):
+    all_recommendations = TIME_RECOMMENDATIONS[time_val] + DOMAIN_RECOMMENDATIONS.get(domain, [])
+    personalized_recs = [rec.replace("Sie ", "Du ").replace("Ihre ", "Deine ").replace("Ihnen ", "dir ") for rec in all_recommendations]
+    return "\n".join([f"• {rec}" for rec in personalized_recs])
+
+# Alle 7 x 5 fertigen Empfehlungstexte, einmal beim Import gerendert
+RECOMMENDATION_TABLE = MappingProxyType({
+    (time_val, domain): _render_recommendations(time_val, domain)
+    for time_val in TIME_RECOMMENDATIONS
+    for domain in DOMAINS
+})
+
+def generate_time_based_recommendation(time_val, skill, challenge, domain):
+    """Empfehlungen für (Zeitwert, Domäne) aus RECOMMENDATION_TABLE - skill und challenge fliessen nicht ein"""
+    recommendation = RECOMMENDATION_TABLE.get((time_val, domain))
+    if recommendation is None:
+        # Domänen ausserhalb von DOMAINS erhalten nur die Basis-Empfehlungen
+        recommendation = _render_recommendations(time_val, domain)
+    return recommendation
+
+# ===== VORGERENDERTE TEXTBAUSTEINE =====
+# Alles, was nur von der Domäne oder dem Zeitwert abhängt, wird einmal pro Prozess gerendert;
+# die Berichte sammeln ihre Teile in Listen und verbinden sie am Ende mit "".join.
+LINE_80 = "-" * 80 + "\n"
+LINE_50 = "-" * 50 + "\n"
+DOUBLE_LINE_80 = "=" * 80 + "\n"
+DOUBLE_LINE_60 = "=" * 60 + "\n"
+
+# Textbaustein-Varianten in der Prüfreihenfolge von _textbaustein_variant: (Baustein, Einleitung statt "Du ")
+TEXTBAUSTEIN_VARIANTS = (
+    ("Unterforderung", "Deine Einschätzung könnte darauf hinweisen, dass du "),
+    ("Überforderung", "Deine Werte deuten darauf hin, dass du "),
+    ("Ideale Passung", "Deine Selbsteinschätzung zeigt, dass du "),
+    ("Unterforderung", "Deine Wahrnehmung könnte bedeuten, dass du "),
+    ("Überforderung", "Deine Einschätzung lässt vermuten, dass du "),
+    ("Ideale Passung", "Deine Werte deuten darauf hin, dass du "),
+)
+DOMAIN_TEXTBAUSTEINE = {
+    domain: tuple(config["textbausteine"][key].replace("Du ", intro) + "\n\n" for key, intro in TEXTBAUSTEIN_VARIANTS)
+    for domain, config in DOMAINS.items()
+}
+# Psychologische Perspektive pro Domäne, inklusive Überschrift der nächsten Schritte
+DOMAIN_PERSPECTIVES = {
+    domain: (
+        "Psychologische Perspektive:\n"
+        f"• {config['flow'].replace('Balance zwischen', 'Ausgleich von')}\n"
+        f"• {config['grawe'].replace('Bedürfnisse:', 'Hier geht es um das Bedürfnis nach')}\n"
+        f"• {config['bischof'].replace('Bindungssystem -', 'Das Bedürfnis nach')}\n"
+        "\nMögliche nächste Schritte:\n"
+    )
+    for domain, config in DOMAINS.items()
+}
+# Zeiterleben-Zeile samt Überschrift des Analyse-Teils
+TIME_LABEL_LINES = {
+    time_val: f"Zeiterleben: {scale['label']}\n\nWas deine Einschätzung zeigen könnte:\n"
+    for time_val, scale in TIME_PERCEPTION_SCALE.items()
+}
+
+ENGAGEMENT_HIGH = " Intensives Engagement - Deine Werte deuten auf hohe Involviertheit hin\n"
+ENGAGEMENT_MEDIUM = " Stabiles Engagement - Deine Einschätzung zeigt solide Beteiligung\n"
+ENGAGEMENT_LOW = " Zurückhaltende Beteiligung - Deine Werte könnten auf Distanz oder Vorsicht hinweisen\n"
+
+COMBINATION_SKILLED_UNDERCHALLENGED = (
+    "\n Interessante Kombination: Deine hohe Kompetenzwahrnehmung trifft auf moderate Anforderungen\n"
+    "Für manche Menschen wirft diese Konstellation Fragen auf:\n"
+    "- Könnten anspruchsvollere Projekte deine Stärken besser nutzen?\n"
+    "- Würde eine Mentor-Role deine Expertise fordern?\n"
+    "- Gibt es Bereiche, wo deine Kompetenzen noch stärker einfließen könnten?\n"
+)
+COMBINATION_DEVELOPING_OVERCHALLENGED = (
+    "\n Besondere Situation: Hohe Anforderungen bei sich entwickelnden Kompetenzen\n"
+    "Diese Konstellation könnte folgende Überlegungen nahelegen:\n"
+    "- Welche Unterstützung könnte beim Kompetenzaufbau helfen?\n"
+    "- Würde Schritt-für-Schritt-Herangehen die Bewältigung erleichtern?\n"
+    "- Welche Lernmöglichkeiten bieten sich in dieser Herausforderung?\n"
+)
+COMBINATION_BALANCED = (
+    "\n Ausgeglichenes Profil - Kompetenzen und Herausforderungen im Einklang\n"
+    "Deine Einschätzung deutet auf eine gute Passung hin. Vielleicht fragst du dich:\n"
+    "- Was genau macht diese Balance für dich aus?\n"
+    "- Wie könntest du diese gelungene Passung auf andere Bereiche übertragen?\n"
+    "- Welche Faktoren tragen zu diesem Gleichgewicht bei?\n"
+)
+
+def _textbaustein_variant(zone, skill, challenge):
+    """Index in TEXTBAUSTEIN_VARIANTS für Zone und Ratings"""
+    if zone == "Akute Unterforderung" or (skill - challenge >= 3):
+        return 0
+    if zone == "Akute Überforderung" or (challenge - skill >= 3):
+        return 1
+    if zone == "Flow - Optimale Passung":
+        return 2
+    if zone == "Unterforderung" or (skill - challenge >= 2):
+        return 3
+    if zone == "Überforderung" or (challenge - skill >= 2):
+        return 4
+    return 5
+
+def _render_domain_interpretation(domain, skill, challenge, time_val, zone):
+    """Rendert die Interpretation einer Domäne direkt (Fallback und Quelle des Fragment-Caches)"""
+    # Berechne die detaillierten Werte
+    diff = skill - challenge
+    mean_level = (skill + challenge) / 2
+
+    parts = [
+        f"{domain}\n",
+        f"Selbsteinschätzung - Fähigkeiten: {skill}/7 | Herausforderungen: {challenge}/7\n",
+        TIME_LABEL_LINES[time_val],
+    ]
+
+    # 🔥 NEUE RESPEKTVOLLE ANALYSE
+    if abs(diff) <= 1:
+        parts.append("🎯 Gute Passung - Deine Kompetenzwahrnehmung und die empfundenen Anforderungen scheinen gut zusammenzupassen\n")
+    elif diff > 1:
+        parts.append(
+            "🟡 Mögliches Entwicklungspotenzial - Deine Selbsteinschätzung zeigt höhere Kompetenzen als aktuelle Herausforderungen\n"
+            f"   - Kompetenzwahrnehmung: {skill}/7\n"
+            f"   - Empfundene Herausforderungen: {challenge}/7\n"
+            "   - Diese Diskrepanz könnte darauf hinweisen, dass Raum für anspruchsvollere Aufgaben besteht\n"
+        )
+    else:
+        parts.append(
+            "🔴 Hohe Anforderungen - Die empfundenen Herausforderungen übersteigen momentan deine Kompetenzwahrnehmung\n"
+            f"   - Kompetenzwahrnehmung: {skill}/7\n"
+            f"   - Empfundene Herausforderungen: {challenge}/7\n"
+            "   - Diese Situation könnte nach gezielter Unterstützung oder Weiterentwicklung rufen\n"
+        )
+
+    # Aktivitäts-Level - respektvoll formuliert
+    if mean_level >= 6:
+        parts.append(ENGAGEMENT_HIGH)
+    elif mean_level >= 4:
+        parts.append(ENGAGEMENT_MEDIUM)
+    else:
+        parts.append(ENGAGEMENT_LOW)
+
+    # Spezifische Interpretationen - explorativ formuliert
+    if skill >= 6 and challenge <= 3:
+        parts.append(COMBINATION_SKILLED_UNDERCHALLENGED)
+    elif skill <= 3 and challenge >= 6:
+        parts.append(COMBINATION_DEVELOPING_OVERCHALLENGED)
+    elif skill >= 5 and challenge >= 5 and abs(diff) <= 1:
+        parts.append(COMBINATION_BALANCED)
+
+    # Domänenspezifischer Textbaustein und Theorie leicht verständlich eingewoben
+    parts.append(DOMAIN_TEXTBAUSTEINE[domain][_textbaustein_variant(zone, skill, challenge)])
+    parts.append(DOMAIN_PERSPECTIVES[domain])
+
+    # Handlungsempfehlungen persönlich formuliert
+    recommendations = generate_time_based_recommendation(time_val, skill, challenge, domain)
+    parts.extend(f"{rec.strip()}\n" for rec in recommendations.split('\n') if rec.strip())
+
+    return "".join(parts)
+
+# ===== VORBERECHNETE INTERPRETATIONEN (MEMORY-MAPPED CACHE) =====
+# Für ganzzahlige Ratings gibt es nur 5 x 7 x 7 x 7 = 1715 verschiedene Interpretationen.
+# Sie werden beim ersten Gebrauch einmal gerendert und als Datei abgelegt:
+# int64-Offsets (INTERPRETATION_COUNT + 1, relativ zum Dateianfang), danach die UTF-8-Texte.
+# Alle Prozesse (z.B. die Worker der Stapelverarbeitung) teilen sich die Seiten über mmap.
+INTERPRETATION_CACHE_VERSION = 1
+INTERPRETATION_TIME_VALUES = tuple(sorted(TIME_PERCEPTION_SCALE))
+INTERPRETATION_COUNT = len(DOMAINS) * (RATING_MAX - RATING_MIN + 1) ** 2 * len(INTERPRETATION_TIME_VALUES)
+_DOMAIN_POSITIONS = {domain: position for position, domain in enumerate(DOMAINS)}
+
+def iter_interpretation_fragments():
+    """Generator über alle ((domain, skill, challenge, time_val), Text) in Cache-Reihenfolge"""
+    for domain in DOMAINS:
+        for skill in range(RATING_MIN, RATING_MAX + 1):
+            for challenge in range(RATING_MIN, RATING_MAX + 1):
+                _, zone, _ = get_cached_flow(skill, challenge)
+                for time_val in INTERPRETATION_TIME_VALUES:
+                    yield ((domain, skill, challenge, time_val),
+                           _render_domain_interpretation(domain, skill, challenge, time_val, zone))
+
+def _interpretation_position(domain, skill, challenge, time_val, zone):
+    """Position im Fragment-Cache oder None, wenn die Eingabe nicht aus dem Cache bedient werden kann"""
+    domain_position = _DOMAIN_POSITIONS.get(domain)
+    if domain_position is None or time_val not in TIME_PERCEPTION_SCALE:
+        return None
+    # Nur echte Integer - 4.0 würde als "4.0/7" gerendert
+    if not all(isinstance(value, numbers.Integral) for value in (skill, challenge, time_val)):
+        return None
+    if not (RATING_MIN <= skill <= RATING_MAX and RATING_MIN <= challenge <= RATING_MAX):
+        return None
+    row, col = int(skill) - RATING_MIN, int(challenge) - RATING_MIN
+    # Der Cache kennt nur die aus den Ratings berechnete Zone
+    if zone != FLOW_ZONES[FLOW_ZONE_TABLE[row, col]][0]:
+        return None
+    size = RATING_MAX - RATING_MIN + 1
+    time_position = INTERPRETATION_TIME_VALUES.index(int(time_val))
+    return ((domain_position * size + row) * size + col) * len(INTERPRETATION_TIME_VALUES) + time_position
+
+def interpretation_cache_path():
+    """
+    Cache-Datei für den aktuellen Stand der Texte: Hash über den Quellcode von reporting, config
+    und scoring (Zonen-Schwellen bestimmen die Textbausteine) sowie über FLOW_ZONE_TABLE selbst.
+    """
+    from . import config, scoring
+    fingerprint = hashlib.sha256(f"v{INTERPRETATION_CACHE_VERSION}".encode())
+    for module_file in (__file__, config.__file__, scoring.__file__):
+        with open(module_file, 'rb') as f:
+            fingerprint.update(f.read())
+    fingerprint.update(np.ascontiguousarray(FLOW_ZONE_TABLE).tobytes())
+    return os.path.join(INTERPRETATION_CACHE_DIR, f"interpretationen_{fingerprint.hexdigest()[:16]}.bin")
+
+def _ensure_private_cache_dir(directory):
+    """
+    Legt das Cache-Verzeichnis mit Rechten 0700 an und prüft, dass es dem aktuellen Benutzer
+    gehört und für niemanden sonst beschreibbar ist - sonst PermissionError.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(f"Cache-Verzeichnis {directory} ist nicht privat")
+
+def _check_cache_file_owner(path):
+    """Die Cache-Datei muss dem aktuellen Benutzer gehören und darf nur für ihn beschreibbar sein"""
+    if not hasattr(os, 'getuid'):
+        return
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(f"Cache-Datei {path} gehört nicht dem aktuellen Benutzer")
+
+def build_interpretation_cache(path):
+    """Rendert alle Interpretationen und schreibt die Cache-Datei atomar (temporäre Datei + os.replace)"""
+    texts = [text.encode('utf-8') for _, text in iter_interpretation_fragments()]
+    offsets = np.empty(len(texts) + 1, dtype=np.int64)
+    offsets[0] = offsets.nbytes
+    offsets[1:] = offsets.nbytes + np.cumsum([len(text) for text in texts])
+
+    _ensure_private_cache_dir(os.path.dirname(path))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(offsets.tobytes())
+            f.writelines(texts)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _map_interpretation_cache(path):
+    """Öffnet die Cache-Datei per mmap -> (mmap, Offsets) oder ValueError bei defekter Datei"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header_size = (INTERPRETATION_COUNT + 1) * np.dtype(np.int64).itemsize
+    if len(mapped) < header_size:
+        raise ValueError("Interpretations-Cache ist unvollständig")
+    offsets = np.frombuffer(mapped, dtype=np.int64, count=INTERPRETATION_COUNT + 1).tolist()
+    if offsets[0] != header_size or offsets[-1] != len(mapped) or any(a > b for a, b in zip(offsets, offsets[1:])):
+        raise ValueError("Interpretations-Cache ist defekt")
+    return mapped, offsets
+
+@functools.cache
+def get_interpretation_fragments():
+    """
+    Liefert eine Funktion Position -> Interpretationstext. Die Cache-Datei wird bei Bedarf
+    (fehlend oder defekt) neu erzeugt; ist das Verzeichnis nicht beschreibbar oder nicht
+    privat, bleiben die Texte im Speicher.
+    """
+    path = interpretation_cache_path()
+    try:
+        _ensure_private_cache_dir(os.path.dirname(path))
+        try:
+            _check_cache_file_owner(path)
+            mapped, offsets = _map_interpretation_cache(path)
+        except (FileNotFoundError, ValueError):
+            build_interpretation_cache(path)
+            mapped, offsets = _map_interpretation_cache(path)
+    except OSError:
+        return tuple(text for _, text in iter_interpretation_fragments()).__getitem__
+
+    def fragment(position):
+        return mapped[offsets[position]:offsets[position + 1]].decode('utf-8')
+    return fragment
+
+def generate_domain_interpretation(domain, skill, challenge, time_val, flow_index, zone):
+    """
+    Interpretation einer Domäne. Ganzzahlige Ratings werden aus dem vorberechneten
+    Fragment-Cache gelesen, alles andere wird direkt gerendert.
+    """
+    position = _interpretation_position(domain, skill, challenge, time_val, zone)
+    if position is None:
+        return _render_domain_interpretation(domain, skill, challenge, time_val, zone)
+    return get_interpretation_fragments()(position)
+
+REPORT_TITLE = DOUBLE_LINE_80 + "🌊 DEINE PERSÖNLICHE FLOW-ANALYSE\n" + DOUBLE_LINE_80 + "\n"
+
+REPORT_INTRO = (
+    "Dies ist deine persönliche Auswertung. Sie zeigt, wie du dich aktuell in deiner Arbeit fühlst\n"
+    "Bedenke, dass dies nur eine Momentaufnahme ist\n"
+    "Menschen und Situationen verändern sich fortlaufend\n"
+    "Dieser kleine Bericht kann dir zeigen, wo du im Moment im Alltag Erfolge feierst\n"
+    "und wo du vielleicht Entlastung oder neue Herausforderungen brauchst.\n\n"
+    "GEMEINSAM GESCHAUT: DREI BLICKE AUF DEINE ARBEITSSITUATION\n"
+    + LINE_80 + "\n"
+    "Wir schauen gemeinsam auf drei Ebenen:\n"
+    "• Flow-Ebene: Wie gut passen deine Fähigkeiten zu den Aufgaben?\n"
+    "• Bedürfnis-Ebene: Was brauchst du, um dich wohlzufühlen?\n"
+    "• Balance-Ebene: Wie gelingt dir der Ausgleich zwischen Sicherheit und Neuem?\n\n"
+    "WIE ES DIR GEHT: DEIN GESAMTBILD\n"
+    + LINE_80 + "\n"
+)
+
+# Gesamtbild je nach durchschnittlichem Flow-Index: (Untergrenze, Format-Vorlage mit {avg_flow:.2f})
+OVERALL_ASSESSMENTS = (
+    (0.6,
+     "Wow! Dein Gesamtwert von {avg_flow:.2f} zeigt: Dir gelingt deine Arbeit richtig gut! 🎉\n\n"
+     "Du findest offenbar eine gute Balance zwischen dem, was du kannst und was von dir gefordert wird.\n"
+     "Das ist etwas Besonderes. Nimm dir einen Moment, dieses Gefühl wahrzunehmen und wertzuschätzen.\n\n"),
+    (0.4,
+     "Dein Wert von {avg_flow:.2f} zeigt: Insgesamt bewältigst du deine Aufgaben gut und nutzt deine Fähigkeiten effektiv. 🔄\n\n"
+     "An manchen Tagen fühlst du dich sicher und im Fluss, an anderen merkst du vielleicht kleine Stolpersteine.\n"
+     "Das ist völlig normal - schauen wir gemeinsam, wo genau du ansetzen kannst.\n\n"),
+    (float('-inf'),
+     "Dein Wert von {avg_flow:.2f} sagt: Momentan ist vieles ziemlich anstrengend für dich. 💭\n\n"
+     "Vielleicht fühlst du dich oft gestresst oder fragst dich, ob alles so bleiben soll.\n"
+     "Es zeigt aber auch, dass du sensibel wahrnimmst, was dich beansprucht. Wichtig ist: Dieser Zustand sollte kein Dauerzustand sein.\n"
+     "Wichtig ist, dass wir genau hinschauen, wo aktuell Belastungen in deinem Berufsleben liegen.\n\n"),
+)
+
+REPORT_DOMAINS_HEADING = "WO DU STEHST: BEREICH FÜR BEREICH\n" + LINE_80 + "\n"
+DOMAIN_SEPARATOR = "\n" + LINE_50 + "\n"
+
+REPORT_ACTION_PLAN = (
+    "WAS JETZT FÜR DICH DRAN IST\n"
+    + LINE_80 + "\n"
+    "Deine Werte zeigen dir auf wo du momentan gut im Fluss und wo du vielleicht Unterstützung brauchst.\n"
+    "Diese Phase bietet dir die Chance, bewusst wahrzunehmen, was dir besonders gelingt und Energie gibt.\n\n"
+    "Basierend auf deinen Werte könntest du:\n\n"
+    "HEUTE:\n"
+    "• Dir einen Bereich aussuchen, in dem du besonders erfolgreich bist, und ihn bewusst geniessen\n"
+    "• Überlege, welche kleine Handlung dir in herausfordernden Bereichen rasch Erleichterung und Klarheit verschaffen kann\n"
+    "• Manchmal kann es bereichernd sein, Gedanken oder Erfahrungen mit jemandem zu teilen, dem du vertraust.\n\n"
+    "KURZFRISTIG (nächste 4 Wochen):\n"
+    "• Schau dir die konkreten Tipps für deine kritischen Bereiche an\n"
+    "• Such dir Unterstützung, wo du sie brauchst\n"
+    "• Vielleicht bemerkst du, wie die kleinen Momente des Gelingens aufleuchten, und je mehr du sie wahrnimmst, desto leichter wird es, ihnen Raum zu geben.\n\n"
+    "LANGFRISTIG (ab 3 Monaten):\n"
+    "• Entwickle deine Stärken weiter\n"
+    "• Sorge für mehr Ausgleich in anstrengenden Bereichen\n"
+    "• Behalte dein Wohlbefinden im Blick\n\n"
+    + DOUBLE_LINE_60
+    + "DEINE STÄRKEN UND RESSOURCEN\n"
+    + DOUBLE_LINE_60 + "\n"
+)
+
+REPORT_NO_STRENGTHS = (
+    "Deine aktuelle Stärke: Selbst in anspruchsvollen Situationen reflektierst du deine Arbeitssituation.\n"
+    "Diese Selbstwahrnehmung ist eine wichtige Grundlage für jede Weiterentwicklung.\n\n"
+)
+
+# Zuordnung der Domänen zu den Motivationssystemen nach Bischof
+MOTIVATION_SYSTEM_DOMAINS = {
+    "Bindung": ["Team-Veränderungen", "Interpersonelle Veränderungen"],
+    "Autonomie": ["Prozess- oder Verfahrensänderungen"],
+    "Exploration": ["Kompetenzanforderungen / neue Aufgaben", "Veränderungen im Betreuungsbedarf der Klient:innen"],
+}
+
+REPORT_MOTIVATION_INTRO = (
+    DOUBLE_LINE_60
+    + "DIE DREI MOTOREN DEINER MOTIVATION\n"
+    + DOUBLE_LINE_60 + "\n"
+    "Nach dem Zürcher Modell von Norbert Bischof wirken drei grundlegende\n"
+    "Motivationssysteme in jedem Menschen. Sie zeigen, was dich antreibt:\n\n"
+)
+
+# Pro System: (Einleitung, Text ab 0.7, Text ab 0.5, Text darunter)
+MOTIVATION_SYSTEM_TEXTS = {
+    "Bindung": (
+        "Das Bindungssystem\n"
+        "Dieses System strebt nach Sicherheit, Vertrautheit und verlässlichen Beziehungen.\n",
+        "Dein Bindungssystem zeigt eine optimale Ausprägung. Du fühlst dich\n"
+        "in deinem Arbeitsumfeld gut aufgehoben und kannst stabile Beziehungen\n"
+        "aufbauen. Diese Sicherheit gibt dir den Rückhalt, um auch schwierige\n"
+        "Situationen zu meistern und für andere da zu sein.\n\n",
+        "Dein Bindungssystem zeigt eine gute Balance. Du findest in vertrauten\n"
+        "Strukturen Halt, bleibst aber gleichzeitig offen für neue Kontakte.\n"
+        "Veränderungen im Team fordern dich heraus, ohne dich zu überfordern.\n"
+        "Diese Ausgewogenheit ist eine wertvolle Ressource in deiner Arbeit.\n\n",
+        "Dein Bindungssystem sucht momentan mehr Stabilität. Vertraute Routinen\n"
+        "und verlässliche Beziehungen könnten dir zusätzlichen Halt geben.\n"
+        "Es kann hilfreich sein, bewährte Verbindungen zu pflegen und sich\n"
+        "klare Rückzugsräume zu schaffen, um neue Kraft zu tanken.\n\n",
+    ),
+    "Autonomie": (
+        "Das Autonomiesystem\n"
+        "Dieses System strebt nach Selbstwirksamkeit, Einfluss und der Möglichkeit,\n"
+        "die eigenen Kompetenzen einzubringen und wirksam zu sein.\n",
+        "Dein Autonomiesystem ist stark ausgeprägt. Du verfügst über klare\n"
+        "Gestaltungsspielräume und kannst deine Expertise wirksam einbringen.\n"
+        "Diese Selbstwirksamkeit ermöglicht es dir, Verantwortung zu übernehmen\n"
+        "und Prozesse aktiv mitzugestalten - eine wertvolle Kompetenz.\n\n",
+        "Dein Autonomiesystem zeigt eine gesunde Balance. Du hast ausreichend\n"
+        "Handlungsspielraum, um eigenständig zu arbeiten, bei gleichzeitig\n"
+        "klaren Leitplanken, die Orientierung geben. Deine Fachkompetenz\n"
+        "wird gesehen und wertgeschätzt - eine ideale Basis für Entwicklung.\n\n",
+        "Dein Autonomiesystem sucht momentan mehr Entfaltungsraum. Dein\n"
+        "Gestaltungswille und deine Kompetenzen möchten stärker zum\n"
+        "Tragen kommen. Es könnte bereichernd sein, gezielt nach Bereichen\n"
+        "zu suchen, in denen du mehr Verantwortung übernehmen kannst.\n\n",
+    ),
+    "Exploration": (
+        "Das Explorationssystem\n"
+        "Dieses System strebt danach, zu wachsen, zu entdecken, zu forschen\n"
+        "und neue Reize zu erleben. Es ist der Motor für Lernen und Entwicklung.\n",
+        "Dein Explorationssystem ist sehr aktiv. Du bist stets offen für\n"
+        "neue Herausforderungen und lässt dich von frischen Ideen begeistern.\n"
+        "Diese natürliche Neugier treibt dich an, dich kontinuierlich\n"
+        "weiterzuentwickeln und deine Kompetenzen zu erweitern.\n\n",
+        "Dein Explorationssystem zeigt eine ausgeglichene Neugier. Du\n"
+        "schätzt die Sicherheit vertrauter Routinen, bleibst aber wachsam\n"
+        "für neue Lernfelder und frische Impulse. Diese Balance zwischen\n"
+        "Bewährtem und Neuem gibt dir Stabilität und Entwicklung zugleich.\n\n",
+        "Dein Explorationssystem sucht momentan nach neuen Anreizen.\n"
+        "Frische Lernimpulse und abwechslungsreiche Herausforderungen\n"
+        "könnten deine natürliche Neugier wieder stärker wecken. Der\n"
+        "Austausch mit inspirierenden Kolleginnen und Kollegen könnte\n"
+        "hier wertvolle neue Perspektiven eröffnen.\n\n",
+    ),
+}
+
+PROFILE_SHAPER = (
+    "Dein persönliches Motivationsprofil\n"
+    "Profil: Der Gestalter\n"
+    "Mehrere deiner Motivationssysteme zeigen eine hohe Aktivität.\n"
+    "Du verfügst über eine starke innere Antriebskraft, die es dir\n"
+    "ermöglicht, nicht nur für dich selbst, sondern auch für andere\n"
+    "wirksam zu sein. Diese Energie ist eine wertvolle Ressource.\n\n"
+)
+PROFILE_BALANCED = (
+    "Dein persönliches Motivationsprofil\n"
+    "Profil: Der Ausgeglichene\n"
+    "Deine Motivationssysteme befinden sich in einer gesunden Balance.\n"
+    "Du findest eine gute Mischung aus Stabilität und Wachstum, die\n"
+    "dir erlaubt, sowohl verlässlich zu arbeiten als auch offen für\n"
+    "neue Entwicklungen zu bleiben. Diese Ausgewogenheit ist eine\n"
+    "solide Basis für nachhaltige berufliche Zufriedenheit.\n\n"
+)
+PROFILE_SEEKER = (
+    "Dein persönliches Motivationsprofil\n"
+    "Profil: Der Suchende\n"
+    "Verschiedene Bereiche deiner Motivation warten auf stärkere\n"
+    "Aktivierung. Dies ist eine Chance, bewusst zu erkunden, welche\n"
+    "Aspekte deiner Arbeit dir besonders wichtig sind. Beginne mit\n"
+    "kleinen Schritten in einem Bereich, der dir am Herzen liegt.\n\n"
+)
+
+REPORT_CLOSING = (
+    "Erfolgreiche Motivation bedeutet nicht, dass alle Systeme stets\n"
+    "maximal aktiv sein müssen. Vielmehr geht es darum, eine bewusste\n"
+    "Balance zu finden und jedes System in seiner Eigenart wertzuschätzen.\n"
+    "Jedes trägt auf seine Weise zu deinem Wohlbefinden und deiner\n"
+    "beruflichen Zufriedenheit bei.\n\n"
+    + DOUBLE_LINE_60
+    + "ZUM ABSCHLUSS\n"
+    + DOUBLE_LINE_60 + "\n"
+    "Vergiss nicht: Diese Analyse zeigt eine Momentaufnahme. Jeder Mensch durchlebt Phasen,\n"
+    "in denen sich Passung und Herausforderungen verändern. Wichtig ist, dass du:\n\n"
+    "• Auf dein Bauchgefühl hörst\n"
+    "• Dir Unterstützung holst, wenn du sie brauchst\n"
+)
+
+def calculate_system_activity(flow_by_domain):
+    """Durchschnittlicher Flow-Index pro Motivationssystem (MOTIVATION_SYSTEM_DOMAINS)"""
+    system_scores = {}
+    for system, domains in MOTIVATION_SYSTEM_DOMAINS.items():
+        values = [flow_by_domain[d] for d in DOMAINS if d in domains]
+        system_scores[system] = round(sum(values) / len(values), 2) if values else 0.0
+    return system_scores
+
+def report_ratings(data):
+    """Rating-Vektor eines Berichts: (skill, challenge, time) pro Domäne in DOMAINS-Reihenfolge"""
+    return tuple((data[f"Skill_{d}"], data[f"Challenge_{d}"], data[f"Time_{d}"]) for d in DOMAINS)
+
+def _build_report_body(ratings):
+    """Alles nach der persönlichen Anrede - hängt nur vom Rating-Vektor ab"""
+    parts = [REPORT_INTRO]
+
+    # Flow-Werte einmal pro Domäne bestimmen
+    flows = {}
+    for domain, (skill, challenge, _) in zip(DOMAINS, ratings):
+        flows[domain] = get_cached_flow(skill, challenge, domain)
+
+    # Gesamtbewertung persönlich und emotional
+    avg_flow = sum(flows[d][0] for d in DOMAINS) / len(DOMAINS)
+    for lower_bound, template in OVERALL_ASSESSMENTS:
+        if avg_flow >= lower_bound:
+            parts.append(template.format(avg_flow=avg_flow))
+            break
+
+    # Detaillierte Domain-Analysen
+    parts.append(REPORT_DOMAINS_HEADING)
+    for domain, (skill, challenge, time_val) in zip(DOMAINS, ratings):
+        flow_index, zone, _ = flows[domain]
+        parts.append(generate_domain_interpretation(domain, skill, challenge, time_val, flow_index, zone))
+        parts.append(DOMAIN_SEPARATOR)
+
+    # Integrierte Handlungsstrategie, danach Stärken und Ressourcen
+    parts.append(REPORT_ACTION_PLAN)
+    strengths = []
+    resources = []
+    for domain, (skill, _, _) in zip(DOMAINS, ratings):
+        if flows[domain][0] >= 0.6:  # Stärken identifizieren
+            strengths.append(f"• {domain}: Du bringst hier besondere Kompetenzen mit (Fähigkeiten: {skill}/7)")
+        if skill >= 5:  # Ressourcen identifizieren
+            resources.append(f"• {domain}: Deine Fähigkeiten ({skill}/7) sind eine wertvolle Ressource")
+
+    if strengths:
+        parts.append("Das sind deine besonderen Stärken:\n" + "\n".join(strengths) + "\n\n")
+    else:
+        parts.append(REPORT_NO_STRENGTHS)
+    if resources:
+        parts.append("Diese Ressourcen stehen dir zur Verfügung:\n" + "\n".join(resources) + "\n\n")
+
+    # Systemische Perspektive: die drei Motivationssysteme
+    systems = calculate_system_activity({d: flows[d][0] for d in DOMAINS})
+    parts.append(REPORT_MOTIVATION_INTRO)
+    for system, (intro, high, medium, low) in MOTIVATION_SYSTEM_TEXTS.items():
+        score = systems[system]
+        parts.append(intro)
+        parts.append(high if score >= 0.7 else medium if score >= 0.5 else low)
+
+    # Gesamtprofil
+    high_count = sum(1 for score in systems.values() if score >= 0.7)
+    medium_count = sum(1 for score in systems.values() if 0.5 <= score < 0.7)
+    if high_count >= 2:
+        parts.append(PROFILE_SHAPER)
+    elif medium_count >= 2 or (high_count == 1 and medium_count == 1):
+        parts.append(PROFILE_BALANCED)
+    else:
+        parts.append(PROFILE_SEEKER)
+
+    # Abschluss mit empowernder Botschaft
+    parts.append(REPORT_CLOSING)
+    return "".join(parts)
+
+_cached_report_body = functools.lru_cache(maxsize=REPORT_CACHE_SIZE)(_build_report_body)
+
+def configure_report_cache(maxsize):
+    """Setzt die Grösse des Bericht-Caches neu (leert ihn dabei); 0 schaltet ihn ab, None = unbegrenzt"""
+    global _cached_report_body
+    _cached_report_body = functools.lru_cache(maxsize=maxsize)(_build_report_body)
+
+def report_cache_info():
+    """Treffer, Fehlzugriffe, maximale und aktuelle Grösse des Bericht-Caches (functools-CacheInfo)"""
+    return _cached_report_body.cache_info()
+
+def generate_comprehensive_smart_report(data, use_cache=True):
+    """
+    Erstellt einen persönlichen, emotional intelligenten Bericht.
+    Der Text ohne Anrede wird pro Rating-Vektor prozessweit gecacht (REPORT_CACHE_SIZE),
+    der Name wird erst danach eingesetzt. use_cache=False umgeht den Cache (Stapelläufe,
+    in denen sich Profile kaum wiederholen).
+    """
+    # Persönliche Ansprache
+    name = data.get('Name', "") if data.get('Name', "") else "Du"
+    ratings = report_ratings(data)
+    if use_cache and all(isinstance(value, numbers.Integral) for rating in ratings for value in rating):
+        # Einheitlicher Schlüssel für int, numpy-Integer usw. - gleiche Ausgabe, gleicher Cache-Eintrag
+        body = _cached_report_body(tuple(tuple(int(value) for value in rating) for rating in ratings))
+    else:
+        body = _build_report_body(ratings)
+    return f"{REPORT_TITLE}Hallo {name}!\n\n{body}"
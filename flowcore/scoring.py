@@ -0,0 +1,123 @@
+"""Flow-Index und Zonen für Skill/Challenge-Ratings - skalar, vektorisiert und per Tabelle"""
+import numpy as np
+
+from .config import DOMAINS
+
+def validate_data(data):
+    for domain in DOMAINS:
+        if data.get(f"Skill_{domain}", None) not in range(1, 8):
+            return False
+        if data.get(f"Challenge_{domain}", None) not in range(1, 8):
+            return False
+        if data.get(f"Time_{domain}", None) not in range(-3, 4):
+            return False
+    return True
+
+def calculate_flow(skill, challenge):
+    diff = skill - challenge
+    mean_level = (skill + challenge) / 2
+    
+    # Präzisere Zonen-Definition mit klaren Schwellenwerten
+    if abs(diff) <= 1 and mean_level >= 5:
+        zone = "Flow - Optimale Passung"
+        explanation = "Idealzone: Fähigkeiten und Herausforderungen im Gleichgewicht"
+    elif diff < -3:
+        zone = "Akute Überforderung"
+        explanation = "Krisenzone: Massive Diskrepanz zu Ungunsten der Fähigkeiten"
+    elif diff > 3:
+        zone = "Akute Unterforderung"
+        explanation = "Krisenzone: Massive Diskrepanz zu Ungunsten der Herausforderungen"
+    elif diff < -2:
+        zone = "Überforderung"
+        explanation = "Warnzone: Deutliche Überlastungssituation"
+    elif diff > 2:
+        zone = "Unterforderung" 
+        explanation = "Warnzone: Deutliche Unterforderungssituation"
+    elif mean_level < 3:
+        zone = "Apathie"
+        explanation = "Rückzugszone: Geringes Engagement in beiden Dimensionen"
+    else:
+        zone = "Stabile Passung"
+        explanation = "Grundbalance: Angemessene Passung mit Entwicklungpotenzial"
+    
+    proximity = 1 - (abs(diff) / 6)
+    flow_index = proximity * (mean_level / 7)
+    return flow_index, zone, explanation
+
+# Zonen in der Prüfreihenfolge von calculate_flow - der Index ist der Zonen-Code
+FLOW_ZONES = [
+    ("Flow - Optimale Passung", "Idealzone: Fähigkeiten und Herausforderungen im Gleichgewicht"),
+    ("Akute Überforderung", "Krisenzone: Massive Diskrepanz zu Ungunsten der Fähigkeiten"),
+    ("Akute Unterforderung", "Krisenzone: Massive Diskrepanz zu Ungunsten der Herausforderungen"),
+    ("Überforderung", "Warnzone: Deutliche Überlastungssituation"),
+    ("Unterforderung", "Warnzone: Deutliche Unterforderungssituation"),
+    ("Apathie", "Rückzugszone: Geringes Engagement in beiden Dimensionen"),
+    ("Stabile Passung", "Grundbalance: Angemessene Passung mit Entwicklungpotenzial"),
+]
+ZONE_NAMES = np.array([zone for zone, _ in FLOW_ZONES], dtype=object)
+ZONE_EXPLANATIONS = np.array([explanation for _, explanation in FLOW_ZONES], dtype=object)
+ZONE_CODES = {zone: code for code, (zone, _) in enumerate(FLOW_ZONES)}
+
+def calculate_flow_array(skill, challenge):
+    """
+    Vektorisierte Variante von calculate_flow für NumPy-Arrays oder pandas Series.
+    Gibt (flow_index, zone_codes, explanations) zurück: zone_codes indiziert
+    FLOW_ZONES/ZONE_NAMES, explanations ist die Lookup-Tabelle ZONE_EXPLANATIONS.
+    """
+    skill = np.asarray(skill, dtype=float)
+    challenge = np.asarray(challenge, dtype=float)
+    diff = skill - challenge
+    mean_level = (skill + challenge) / 2
+
+    # Gleiche Schwellenwerte und Reihenfolge wie in calculate_flow
+    conditions = [
+        (np.abs(diff) <= 1) & (mean_level >= 5),
+        diff < -3,
+        diff > 3,
+        diff < -2,
+        diff > 2,
+        mean_level < 3,
+    ]
+    zone_codes = np.select(conditions, np.arange(len(conditions)), default=len(FLOW_ZONES) - 1).astype(np.int8)
+
+    proximity = 1 - (np.abs(diff) / 6)
+    flow_index = proximity * (mean_level / 7)
+    return flow_index, zone_codes, ZONE_EXPLANATIONS
+
+# Vorberechnete 7x7-Tabelle für alle ganzzahligen Slider-Werte (Index = Wert - 1)
+RATING_MIN, RATING_MAX = 1, 7
+_rating_grid = np.arange(RATING_MIN, RATING_MAX + 1)
+FLOW_INDEX_TABLE, FLOW_ZONE_TABLE, _ = calculate_flow_array(_rating_grid[:, None], _rating_grid[None, :])
+FLOW_INDEX_TABLE.setflags(write=False)
+FLOW_ZONE_TABLE.setflags(write=False)
+
+def is_integer_rating(values):
+    """Prüft, ob alle Werte ganzzahlige Ratings von 1 bis 7 sind (Tabellen-Pfad)"""
+    values = np.asarray(values)
+    if values.size == 0:
+        return True
+    if not np.issubdtype(values.dtype, np.number):
+        return False
+    return bool(np.all((values >= RATING_MIN) & (values <= RATING_MAX) & (values == np.floor(values))))
+
+def lookup_flow_array(skill, challenge):
+    """
+    Wie calculate_flow_array, nutzt für ganzzahlige Ratings aber die vorberechnete Tabelle.
+    Gebrochene Werte (z.B. Team-Mittelwerte) gehen über den berechneten Pfad.
+    """
+    skill = np.asarray(skill)
+    challenge = np.asarray(challenge)
+    if not (is_integer_rating(skill) and is_integer_rating(challenge)):
+        return calculate_flow_array(skill, challenge)
+    rows = skill.astype(np.intp) - RATING_MIN
+    cols = challenge.astype(np.intp) - RATING_MIN
+    return FLOW_INDEX_TABLE[rows, cols], FLOW_ZONE_TABLE[rows, cols], ZONE_EXPLANATIONS
+
+def get_cached_flow(skill, challenge, domain=None):
+    """Flow-Berechnung über die vorberechnete Tabelle (O(1) für ganzzahlige Ratings)"""
+    if skill in range(RATING_MIN, RATING_MAX + 1) and challenge in range(RATING_MIN, RATING_MAX + 1):
+        code = FLOW_ZONE_TABLE[int(skill) - RATING_MIN, int(challenge) - RATING_MIN]
+        flow_index = float(FLOW_INDEX_TABLE[int(skill) - RATING_MIN, int(challenge) - RATING_MIN])
+        zone, explanation = FLOW_ZONES[code]
+        return flow_index, zone, explanation
+    return calculate_flow(skill, challenge)
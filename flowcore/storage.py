@@ -0,0 +1,435 @@
+"""SQLite-Speicher: Schema-Migrationen, Einreichungen und Team-Aggregate"""
+import functools
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .config import DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KIB, DB_MAX_VARIABLES, DB_NAME, DOMAINS, TEAM_METRICS
+from .exchange import payload_to_data
+from .scoring import FLOW_ZONES, lookup_flow_array, validate_data
+from .team import domain_stats_from_moments
+
+SCHEMA_VERSION = 3
+
+def _create_schema(conn):
+    """
+    Legt das Schema an bzw. migriert bestehende flow_data.db-Dateien schrittweise.
+    Die Version steht in PRAGMA user_version:
+    - 1: normalisiertes Schema (domains, submissions, responses mit Integer-Fremdschlüsseln)
+    - 2: materialisierte Team-Aggregate, die save_to_db in derselben Transaktion pflegt
+    - 3: materialisierte Teilnehmerzahl (team_participants)
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Erneut prüfen - ein anderer Prozess könnte inzwischen migriert haben
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            _migrate_to_normalized_schema(conn)
+        if version < 2:
+            _migrate_to_team_aggregates(conn)
+        if version < 3:
+            _migrate_to_team_participants(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def _migrate_to_normalized_schema(conn):
+    """
+    Schema-Version 1:
+    - domains: Dimensionstabelle statt des vollen Domänen-Namens in jeder Zeile
+    - submissions: eine Zeile pro save_to_db-Aufruf (Name + Zeitpunkt)
+    - responses: eine Zeile pro Domäne mit Integer-Fremdschlüsseln
+    Eine vorhandene alte, flache responses-Tabelle wird dabei übernommen.
+    """
+    legacy_columns = [row[1] for row in conn.execute("PRAGMA table_info(responses)")]
+    has_legacy_table = "domain" in legacy_columns
+    if has_legacy_table:
+        conn.execute("ALTER TABLE responses RENAME TO responses_legacy")
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS domains
+                 (id INTEGER PRIMARY KEY,
+                  name TEXT NOT NULL UNIQUE)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS submissions
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  name TEXT,
+                  timestamp DATETIME)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS responses
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  submission_id INTEGER NOT NULL REFERENCES submissions(id) ON DELETE CASCADE,
+                  domain_id INTEGER NOT NULL REFERENCES domains(id),
+                  skill INTEGER,
+                  challenge INTEGER,
+                  time_perception INTEGER,
+                  timestamp DATETIME)''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_domain_timestamp ON responses (domain_id, timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_submission ON responses (submission_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_submissions_name ON submissions (name)")
+    conn.executemany("INSERT OR IGNORE INTO domains (name) VALUES (?)", [(d,) for d in DOMAINS])
+
+    if has_legacy_table:
+        _migrate_legacy_responses(conn)
+        conn.execute("DROP TABLE responses_legacy")
+
+def _migrate_to_team_aggregates(conn):
+    """
+    Schema-Version 2: laufende Summen für die Team-Analyse, damit die CBI-Seite
+    nicht mehr die ganze Historie scannen muss.
+    - team_domain_aggregates: count, Summe und Quadratsumme pro Domäne und Kennzahl
+    - team_zone_counts: Anzahl pro Zonen-Code aus FLOW_ZONES
+    - team_time_counts: Anzahl pro Zeitwert
+    Bestehende Antworten werden einmalig eingerechnet.
+    """
+    metric_columns = ", ".join(f"{m}_sum REAL NOT NULL DEFAULT 0, {m}_sum_sq REAL NOT NULL DEFAULT 0" for m in TEAM_METRICS)
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS team_domain_aggregates
+                  (domain_id INTEGER PRIMARY KEY REFERENCES domains(id),
+                   count INTEGER NOT NULL DEFAULT 0,
+                   {metric_columns})''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS team_zone_counts
+                 (zone_code INTEGER PRIMARY KEY,
+                  count INTEGER NOT NULL DEFAULT 0)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS team_time_counts
+                 (time_perception INTEGER PRIMARY KEY,
+                  count INTEGER NOT NULL DEFAULT 0)''')
+    rows = conn.execute("SELECT domain_id, skill, challenge, time_perception FROM responses").fetchall()
+    _update_team_aggregates(conn, rows)
+
+def _migrate_to_team_participants(conn):
+    """
+    Schema-Version 3: Teilnehmerzahl ohne COUNT(DISTINCT name) über alle Einreichungen.
+    - team_participants: jeder Name genau einmal (Primärschlüssel, INSERT OR IGNORE)
+    - team_participant_count: eine Zeile mit der Anzahl der Einträge in team_participants
+    Bestehende Einreichungen werden einmalig eingerechnet.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS team_participants (name TEXT PRIMARY KEY)")
+    conn.execute('''CREATE TABLE IF NOT EXISTS team_participant_count
+                 (id INTEGER PRIMARY KEY CHECK (id = 1),
+                  count INTEGER NOT NULL DEFAULT 0)''')
+    conn.execute("INSERT OR IGNORE INTO team_participant_count (id, count) VALUES (1, 0)")
+    names = [row[0] for row in conn.execute("SELECT DISTINCT name FROM submissions")]
+    _update_team_participants(conn, names)
+
+def _migrate_legacy_responses(conn):
+    """Überträgt Zeilen der alten flachen responses-Tabelle ins normalisierte Schema"""
+    conn.execute("INSERT OR IGNORE INTO domains (name) SELECT DISTINCT domain FROM responses_legacy WHERE domain IS NOT NULL")
+    # Alle Zeilen eines save_to_db-Aufrufs teilen sich Name und Zeitstempel
+    conn.execute('''INSERT INTO submissions (name, timestamp)
+                    SELECT name, timestamp FROM responses_legacy
+                    GROUP BY name, timestamp
+                    ORDER BY MIN(id)''')
+    conn.execute('''INSERT INTO responses
+                    (submission_id, domain_id, skill, challenge, time_perception, timestamp)
+                    SELECT s.id, d.id, l.skill, l.challenge, l.time_perception, l.timestamp
+                    FROM responses_legacy l
+                    JOIN submissions s ON s.name IS l.name AND s.timestamp IS l.timestamp
+                    JOIN domains d ON d.name = l.domain
+                    ORDER BY l.id''')
+
+def _update_team_participants(conn, names):
+    """
+    Trägt die Namen neuer Einreichungen in team_participants ein und erhöht die
+    Teilnehmerzahl um die tatsächlich neuen. Läuft in der Transaktion des Aufrufers.
+    """
+    # NULL zählt wie bei COUNT(DISTINCT name) nicht als Teilnehmer
+    names = [(name,) for name in names if name is not None]
+    if not names:
+        return
+    added = conn.executemany("INSERT OR IGNORE INTO team_participants (name) VALUES (?)", names).rowcount
+    if added > 0:
+        conn.execute("UPDATE team_participant_count SET count = count + ? WHERE id = 1", (added,))
+
+def get_domain_ids(conn):
+    """Zuordnung Domänen-Name -> domains.id"""
+    return dict(conn.execute("SELECT name, id FROM domains").fetchall())
+
+def _update_team_aggregates(conn, rows):
+    """
+    Rechnet neue Antworten (domain_id, skill, challenge, time_perception) in die
+    materialisierten Team-Aggregate ein. Läuft in der Transaktion des Aufrufers.
+    """
+    if not rows:
+        return
+    frame = pd.DataFrame(rows, columns=['domain_id'] + TEAM_METRICS)
+    values = frame[TEAM_METRICS].astype(float)
+    grouped = values.groupby(frame['domain_id'])
+    sums = grouped.sum()
+    sums_sq = (values ** 2).groupby(frame['domain_id']).sum()
+    counts = grouped.size()
+
+    metric_names = [f"{m}{suffix}" for m in TEAM_METRICS for suffix in ("_sum", "_sum_sq")]
+    conn.executemany(
+        f'''INSERT INTO team_domain_aggregates (domain_id, count, {", ".join(metric_names)})
+            VALUES (?, ?, {", ".join("?" * len(metric_names))})
+            ON CONFLICT(domain_id) DO UPDATE SET count = count + excluded.count,
+            {", ".join(f"{c} = {c} + excluded.{c}" for c in metric_names)}''',
+        [
+            (int(domain_id), int(counts[domain_id]),
+             *(float(table.loc[domain_id, m]) for m in TEAM_METRICS for table in (sums, sums_sq)))
+            for domain_id in counts.index
+        ]
+    )
+
+    _, zone_codes, _ = lookup_flow_array(frame['skill'], frame['challenge'])
+    zone_counts = np.bincount(zone_codes, minlength=len(FLOW_ZONES))
+    conn.executemany(
+        '''INSERT INTO team_zone_counts (zone_code, count) VALUES (?, ?)
+           ON CONFLICT(zone_code) DO UPDATE SET count = count + excluded.count''',
+        [(code, int(count)) for code, count in enumerate(zone_counts) if count]
+    )
+    conn.executemany(
+        '''INSERT INTO team_time_counts (time_perception, count) VALUES (?, ?)
+           ON CONFLICT(time_perception) DO UPDATE SET count = count + excluded.count''',
+        [(int(t), int(count)) for t, count in frame['time_perception'].value_counts().items()]
+    )
+
+@functools.cache
+def get_db_connection():
+    """
+    Eine SQLite-Verbindung pro Prozess statt connect/close bei jedem Rerun.
+    WAL erlaubt parallele Leser während eines Schreibvorgangs, der Busy-Timeout
+    vermeidet "database is locked" bei gleichzeitigen Nutzer:innen.
+    Das Schema wird dabei genau einmal pro Prozess angelegt.
+    """
+    conn = sqlite3.connect(DB_NAME, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    _create_schema(conn)
+    # Streamlit-Sessions laufen in eigenen Threads - Zugriffe auf die geteilte Verbindung serialisieren
+    return conn, threading.RLock()
+
+@contextmanager
+def db_connection():
+    """Liefert die Prozess-Verbindung exklusiv für die Dauer des with-Blocks"""
+    conn, lock = get_db_connection()
+    with lock:
+        yield conn
+
+def init_db():
+    get_db_connection()
+
+def save_to_db(data):
+    timestamp = datetime.now()
+    with db_connection() as conn, conn:
+        domain_ids = get_domain_ids(conn)
+        cursor = conn.execute("INSERT INTO submissions (name, timestamp) VALUES (?,?)",
+                              (data.get("Name", ""), timestamp))
+        submission_id = cursor.lastrowid
+        rows = []
+        for domain in DOMAINS:
+            conn.execute('''INSERT INTO responses 
+                         (submission_id, domain_id, skill, challenge, time_perception, timestamp)
+                         VALUES (?,?,?,?,?,?)''',
+                      (submission_id, domain_ids[domain], 
+                       data[f"Skill_{domain}"], 
+                       data[f"Challenge_{domain}"], 
+                       data[f"Time_{domain}"],
+                       timestamp))
+            rows.append((domain_ids[domain], data[f"Skill_{domain}"], data[f"Challenge_{domain}"], data[f"Time_{domain}"]))
+        # Team-Aggregate in derselben Transaktion fortschreiben
+        _update_team_aggregates(conn, rows)
+        _update_team_participants(conn, [data.get("Name", "")])
+
+def bulk_save_payloads(payloads):
+    """
+    Schreibt viele Exporte im Format von build_machine_readable_payload in einer
+    einzigen Transaktion per executemany. Duplikate (gleicher Name und created_at,
+    im Batch oder bereits in der DB) und ungültige Payloads werden übersprungen.
+    Gibt die Zeilenzahlen zurück.
+    """
+    report = {'submissions': 0, 'responses': 0, 'duplicates': 0, 'invalid': 0}
+    submissions = {}
+    for payload in payloads:
+        # JSON-Uploads können Listen, Zahlen oder null statt eines Objekts enthalten
+        if not isinstance(payload, dict):
+            report['invalid'] += 1
+            continue
+        data = payload_to_data(payload)
+        try:
+            timestamp = datetime.fromisoformat(payload.get("created_at", "")).isoformat(sep=" ")
+        except (TypeError, ValueError):
+            timestamp = None
+        if data is None or timestamp is None or not validate_data(data):
+            report['invalid'] += 1
+            continue
+        data["Name"] = str(data["Name"] or "")
+        key = (data["Name"], timestamp)
+        if key in submissions:
+            report['duplicates'] += 1
+            continue
+        submissions[key] = data
+
+    with db_connection() as conn, conn:
+        conn.execute("BEGIN IMMEDIATE")
+        # Bereits gespeicherte Einreichungen derselben Personen ausschliessen (nutzt den Namens-Index)
+        names = sorted({name for name, _ in submissions})
+        for i in range(0, len(names), DB_MAX_VARIABLES):
+            batch = names[i:i + DB_MAX_VARIABLES]
+            existing = conn.execute(
+                f"SELECT name, timestamp FROM submissions WHERE name IN ({','.join('?' * len(batch))})", batch)
+            for key in existing:
+                if submissions.pop(tuple(key), None) is not None:
+                    report['duplicates'] += 1
+        if not submissions:
+            return report
+
+        domain_ids = get_domain_ids(conn)
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM submissions").fetchone()[0]
+        conn.executemany("INSERT INTO submissions (name, timestamp) VALUES (?,?)", list(submissions))
+        # Innerhalb der IMMEDIATE-Transaktion schreibt niemand sonst - die neuen IDs folgen auf last_id
+        new_ids = dict(((name, timestamp), submission_id) for submission_id, name, timestamp in conn.execute(
+            "SELECT id, name, timestamp FROM submissions WHERE id > ?", (last_id,)))
+
+        rows = [
+            (new_ids[key], domain_ids[domain],
+             data[f"Skill_{domain}"], data[f"Challenge_{domain}"], data[f"Time_{domain}"], key[1])
+            for key, data in submissions.items()
+            for domain in DOMAINS
+        ]
+        conn.executemany('''INSERT INTO responses 
+                             (submission_id, domain_id, skill, challenge, time_perception, timestamp)
+                             VALUES (?,?,?,?,?,?)''', rows)
+        _update_team_aggregates(conn, [row[1:5] for row in rows])
+        _update_team_participants(conn, [name for name, _ in submissions])
+
+    report['submissions'] = len(submissions)
+    report['responses'] = len(rows)
+    return report
+
+def _build_response_filter(conn, start_date=None, end_date=None, names=None, domains=None):
+    """
+    WHERE-Klausel und Parameter für gefilterte Abfragen auf responses/submissions/domains.
+    Die Namensauswahl kommt in die temporäre Tabelle filter_names statt in einzelne
+    Platzhalter - beliebig viele Namen sprengen so nicht das Parameter-Limit von SQLite.
+    Der Aufrufer schliesst die dabei begonnene Transaktion (with conn).
+    """
+    clauses = []
+    params = []
+    if start_date is not None:
+        clauses.append("r.timestamp >= ?")
+        params.append(datetime.combine(start_date, datetime.min.time()).isoformat(sep=" "))
+    if end_date is not None:
+        clauses.append("r.timestamp < ?")
+        params.append(datetime.combine(end_date + timedelta(days=1), datetime.min.time()).isoformat(sep=" "))
+    if names:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS filter_names (name TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.filter_names")
+        conn.executemany("INSERT OR IGNORE INTO temp.filter_names (name) VALUES (?)", [(name,) for name in names])
+        clauses.append("s.name IN (SELECT name FROM temp.filter_names)")
+    if domains:
+        clauses.append(f"d.name IN ({','.join('?' * len(domains))})")
+        params.extend(domains)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+def get_db_filter_options():
+    """Namen und Zeitraum der gespeicherten Daten für die Filter-Steuerelemente"""
+    with db_connection() as conn:
+        names = [row[0] for row in conn.execute("SELECT DISTINCT name FROM submissions ORDER BY name")]
+        first, last = conn.execute("SELECT MIN(timestamp), MAX(timestamp) FROM submissions").fetchone()
+    date_range = None
+    if first is not None:
+        date_range = (datetime.fromisoformat(first).date(), datetime.fromisoformat(last).date())
+    return names, date_range
+
+def query_team_aggregates(start_date=None, end_date=None, names=None, domains=None):
+    """
+    Aggregiert die DB-Daten direkt in SQLite statt alle Zeilen nach pandas zu laden.
+    Filter: Zeitraum (inklusive), Namen und Domänen.
+    Rückgabe: dict mit domain_stats (Mittelwerte, *_std, count pro Domäne),
+    zone_counts, time_counts und participant_count - passend für
+    render_team_analysis und build_cbi_analysis.
+    """
+    joins = '''FROM responses r
+               JOIN submissions s ON s.id = r.submission_id
+               JOIN domains d ON d.id = r.domain_id'''
+    moments = ", ".join(
+        f"AVG(r.{m}) AS {m}, "
+        f"(SUM(r.{m} * r.{m}) - SUM(r.{m}) * SUM(r.{m}) * 1.0 / COUNT(*)) / (COUNT(*) - 1) AS {m}_var"
+        for m in TEAM_METRICS
+    )
+
+    with db_connection() as conn, conn:
+        where, params = _build_response_filter(conn, start_date, end_date, names, domains)
+        domain_stats = pd.read_sql_query(
+            f"SELECT d.name AS domain, {moments}, COUNT(*) AS count {joins} {where} GROUP BY d.name ORDER BY d.name",
+            conn, params=params, index_col='domain')
+        rating_counts = conn.execute(
+            f"SELECT r.skill, r.challenge, COUNT(*) {joins} {where} GROUP BY r.skill, r.challenge",
+            params).fetchall()
+        time_counts = dict(conn.execute(
+            f"SELECT r.time_perception, COUNT(*) {joins} {where} GROUP BY r.time_perception",
+            params).fetchall())
+        participant_count = conn.execute(
+            f"SELECT COUNT(DISTINCT s.name) {joins} {where}", params).fetchone()[0]
+
+    # SQLite kennt keine Wurzel-Funktion in jeder Version - nur die Varianzen (max. 5 Zeilen) hier umrechnen
+    for m in TEAM_METRICS:
+        domain_stats[f"{m}_std"] = np.sqrt(domain_stats.pop(f"{m}_var").astype(float).clip(lower=0))
+
+    # Zonen-Zähler aus den (höchstens 49) Skill/Challenge-Kombinationen
+    zone_counts = np.zeros(len(FLOW_ZONES), dtype=np.int64)
+    if rating_counts:
+        skills, challenges, counts = (np.array(col) for col in zip(*rating_counts))
+        _, zone_codes, _ = lookup_flow_array(skills, challenges)
+        zone_counts = np.bincount(zone_codes, weights=counts, minlength=len(FLOW_ZONES)).astype(np.int64)
+
+    return {
+        'domain_stats': domain_stats,
+        'zone_counts': zone_counts,
+        'time_counts': time_counts,
+        'participant_count': participant_count
+    }
+
+def get_materialized_team_aggregates():
+    """
+    Liest die von save_to_db fortgeschriebenen Team-Aggregate in O(Domänen),
+    ohne die Antwort-Historie zu scannen. Format wie query_team_aggregates.
+    """
+    with db_connection() as conn:
+        moments = pd.read_sql_query(
+            '''SELECT d.name AS domain, a.*
+               FROM team_domain_aggregates a
+               JOIN domains d ON d.id = a.domain_id
+               WHERE a.count > 0
+               ORDER BY d.name''',
+            conn, index_col='domain')
+        zone_rows = conn.execute("SELECT zone_code, count FROM team_zone_counts").fetchall()
+        time_counts = dict(conn.execute("SELECT time_perception, count FROM team_time_counts WHERE count > 0").fetchall())
+        participant_count = conn.execute("SELECT count FROM team_participant_count WHERE id = 1").fetchone()[0]
+
+    sums = moments[[f"{m}_sum" for m in TEAM_METRICS]].set_axis(TEAM_METRICS, axis=1)
+    sums_sq = moments[[f"{m}_sum_sq" for m in TEAM_METRICS]].set_axis(TEAM_METRICS, axis=1)
+    zone_counts = np.zeros(len(FLOW_ZONES), dtype=np.int64)
+    for code, count in zone_rows:
+        zone_counts[code] = count
+
+    return {
+        'domain_stats': domain_stats_from_moments(sums, sums_sq, moments['count']),
+        'zone_counts': zone_counts,
+        'time_counts': time_counts,
+        'participant_count': participant_count
+    }
+
+def reset_database():
+    """Löscht alle Daten aus der Datenbank"""
+    with db_connection() as conn, conn:
+        conn.execute("DELETE FROM responses")
+        conn.execute("DELETE FROM submissions")
+        conn.execute("DELETE FROM team_domain_aggregates")
+        conn.execute("DELETE FROM team_zone_counts")
+        conn.execute("DELETE FROM team_time_counts")
+        conn.execute("DELETE FROM team_participants")
+        conn.execute("UPDATE team_participant_count SET count = 0 WHERE id = 1")
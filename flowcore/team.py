@@ -0,0 +1,148 @@
+"""Team-Aggregation: Domänen-Statistiken, Streaming-Akkumulatoren und Changebereitschafts-Indikator (CBI)"""
+import numpy as np
+import pandas as pd
+
+from .config import DOMAINS, TEAM_METRICS
+from .scoring import FLOW_ZONES, ZONE_CODES, ZONE_NAMES, calculate_flow_array, lookup_flow_array
+
+def compute_domain_stats(df):
+    """Mittelwert, Standardabweichung und Anzahl pro Domäne aus Rohdaten"""
+    grouped = df.groupby('domain', observed=True)[TEAM_METRICS]
+    domain_stats = grouped.mean().join(grouped.std().add_suffix('_std'))
+    domain_stats['count'] = grouped.size()
+    return domain_stats
+
+def team_overview(domain_stats):
+    """Team-Übersicht: Mittelwerte pro Domäne (gerundet) mit Flow-Index und Zone"""
+    overview = domain_stats[TEAM_METRICS].round(2)
+    flow_indices, zone_codes, _ = calculate_flow_array(overview['skill'], overview['challenge'])
+    overview = overview.copy()
+    overview['flow_index'] = flow_indices
+    overview['zone'] = ZONE_NAMES[zone_codes]
+    return overview
+
+# ===== STREAMING-AGGREGATION FÜR GROSSE TEAM-DATENSÄTZE =====
+def new_team_accumulator():
+    """Leerer Zwischenstand für accumulate_team_chunk (count/sum/sum of squares pro Domäne)"""
+    empty = pd.DataFrame(columns=TEAM_METRICS, dtype=float)
+    return {
+        'sum': empty,
+        'sum_sq': empty,
+        'count': pd.Series(dtype=float),
+        'zone_counts': np.zeros(len(FLOW_ZONES), dtype=np.int64),
+        'time_counts': pd.Series(dtype=np.int64),
+        'names': set(),
+        'rows': 0
+    }
+
+def accumulate_team_chunk(accumulator, chunk):
+    """Addiert einen Teil-DataFrame (domain, name, skill, challenge, time_perception) zum Zwischenstand"""
+    if chunk.empty:
+        return accumulator
+    values = chunk[TEAM_METRICS].astype(float)
+    grouped = values.groupby(chunk['domain'], observed=True)
+    accumulator['sum'] = accumulator['sum'].add(grouped.sum(), fill_value=0)
+    accumulator['sum_sq'] = accumulator['sum_sq'].add((values ** 2).groupby(chunk['domain'], observed=True).sum(), fill_value=0)
+    accumulator['count'] = accumulator['count'].add(grouped.size(), fill_value=0)
+
+    _, zone_codes, _ = lookup_flow_array(chunk['skill'], chunk['challenge'])
+    accumulator['zone_counts'] += np.bincount(zone_codes, minlength=len(FLOW_ZONES))
+    accumulator['time_counts'] = accumulator['time_counts'].add(chunk['time_perception'].value_counts(), fill_value=0)
+    accumulator['names'].update(chunk['name'].unique())
+    accumulator['rows'] += len(chunk)
+    return accumulator
+
+def domain_stats_from_moments(sums, sums_sq, count):
+    """Mittelwert, Stichproben-Standardabweichung und Anzahl aus Summe und Quadratsumme pro Domäne"""
+    domain_stats = sums.div(count, axis=0)
+    variance = (sums_sq - sums ** 2 / count.values[:, None]).div(count - 1, axis=0)
+    domain_stats = domain_stats.join(np.sqrt(variance.clip(lower=0)).add_suffix('_std'))
+    domain_stats['count'] = count.astype(np.int64)
+    domain_stats.index.name = 'domain'
+    return domain_stats
+
+def finalize_team_accumulator(accumulator):
+    """Wandelt den Zwischenstand in Team-Aggregate im Format von query_team_aggregates um"""
+    return {
+        'domain_stats': domain_stats_from_moments(accumulator['sum'], accumulator['sum_sq'], accumulator['count']),
+        'zone_counts': accumulator['zone_counts'].copy(),
+        'time_counts': accumulator['time_counts'].astype(np.int64).to_dict(),
+        'participant_count': len(accumulator['names'])
+    }
+
+# ===== KORRIGIERTE FUNKTION FÜR DIE CHANGE-BEREITSCHAFTS-ANALYSE =====
+def calculate_team_cbi_analysis(df):
+    """
+    Führt eine tiefgehende Analyse der Team-Daten durch und berechnet den
+    Changebereitschafts-Indikator (CBI) nach der exakten Formel:
+    CBI = (Anzahl Flow-Zustände + Anzahl Unterforderung) / Gesamtanzahl - Anteil Überforderung
+    """
+    if df.empty:
+        return None
+
+    # Flow-Zustände für alle Person-Domänen-Kombinationen auf einmal bestimmen
+    _, zone_codes, _ = lookup_flow_array(df['skill'], df['challenge'])
+    zone_counts = np.bincount(zone_codes, minlength=len(FLOW_ZONES))
+    time_counts = df['time_perception'].value_counts()
+
+    return build_cbi_analysis(compute_domain_stats(df), zone_counts, time_counts, df['name'].nunique())
+
+def build_cbi_analysis(domain_stats, zone_counts, time_counts, participant_count):
+    """
+    Berechnet die CBI-Ergebnisse aus bereits aggregierten Werten:
+    domain_stats (Mittelwerte, *_std, count pro Domäne), zone_counts (Anzahl pro
+    Zonen-Code aus FLOW_ZONES), time_counts (Anzahl pro Zeitwert) und Teilnehmerzahl.
+    """
+    total_observations = int(np.sum(zone_counts))
+    if total_observations == 0:
+        return None
+
+    analysis_results = {
+        'domain_means': {},
+        'domain_std': {},
+        'time_distribution': {i: 0 for i in range(-3, 4)},
+        'flow_states': {'flow': 0, 'underchallenge': 0, 'overchallenge': 0, 'apathy': 0},
+        'cbi_score': 0,
+        'cbi_interpretation': "",
+        'participant_count': participant_count,
+        'total_observations': total_observations
+    }
+    
+    # Durchschnitt und Standardabweichung für jede Domäne
+    for domain in DOMAINS:
+        if domain in domain_stats.index:
+            analysis_results['domain_means'][domain] = {
+                metric: round(domain_stats.loc[domain, metric], 2) for metric in TEAM_METRICS
+            }
+            analysis_results['domain_std'][domain] = {
+                metric: round(domain_stats.loc[domain, f"{metric}_std"], 2) for metric in TEAM_METRICS
+            }
+    
+    # Zeitwahrnehmungs-Verteilung
+    for time_val in analysis_results['time_distribution']:
+        analysis_results['time_distribution'][time_val] = int(time_counts.get(time_val, 0))
+    
+    # Flow-Zustände aus den Zonen-Zählern
+    analysis_results['flow_states']['flow'] = int(zone_counts[ZONE_CODES["Flow - Optimale Passung"]])
+    analysis_results['flow_states']['underchallenge'] = int(zone_counts[ZONE_CODES["Akute Unterforderung"]] + zone_counts[ZONE_CODES["Unterforderung"]])
+    analysis_results['flow_states']['overchallenge'] = int(zone_counts[ZONE_CODES["Akute Überforderung"]] + zone_counts[ZONE_CODES["Überforderung"]])
+    analysis_results['flow_states']['apathy'] = int(zone_counts[ZONE_CODES["Apathie"]])
+    
+    # Berechne den Changebereitschafts-Indikator (CBI) nach der exakten Formel
+    flow_count = analysis_results['flow_states']['flow']
+    underchallenge_count = analysis_results['flow_states']['underchallenge']
+    overchallenge_count = analysis_results['flow_states']['overchallenge']
+    
+    # EXAKTE FORMEL: CBI = (Flow + Unterforderung)/Gesamt - Überforderung/Gesamt
+    cbi = (flow_count + underchallenge_count) / total_observations - (overchallenge_count / total_observations)
+    analysis_results['cbi_score'] = round(cbi, 2)
+    
+    # Interpretation des CBI gemäß der Grafik
+    if cbi > 0.5:
+        analysis_results['cbi_interpretation'] = "✅ **CBI > 0,5: Gute Basis für Change-Prozesse** - Das Team ist offen für Neues und Veränderungen können positiv aufgenommen werden."
+    elif cbi >= 0:
+        analysis_results['cbi_interpretation'] = "⚠️ **CBI zwischen 0 und 0,5: Vorsichtige Implementierung** - Veränderungen sollten vorsichtig und gut begleitet eingeführt werden."
+    else:
+        analysis_results['cbi_interpretation'] = "❌ **CBI < 0: Starke Widerstände** - Arbeiten Sie zuerst an Sicherheit und Stabilität, bevor größere Veränderungen umgesetzt werden."
+    
+    return analysis_results
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests laufen gegen den Quellbaum (flowcore ist nicht installiert)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+"""Stapelverarbeitung: gleiche Einreichung -> gleiche Ausgabe, egal ob JSON oder CSV"""
+import os
+
+import pytest
+
+from flowcore import DOMAINS, export_machine_readable_csv_bytes, export_machine_readable_json
+from flowcore.batch import run_batch
+
+
+def submission():
+    data = {"Name": "Alex"}
+    for domain in DOMAINS:
+        data.update({f"Skill_{domain}": 5, f"Challenge_{domain}": 3, f"Time_{domain}": 2})
+    return data
+
+
+@pytest.mark.parametrize("created_at", ["2025-01-02T05:04:05+02:00", "2025-01-02T03:04:05"])
+def test_json_and_csv_exports_produce_the_same_files(tmp_path, created_at):
+    outputs = {}
+    for suffix, export in (('.json', export_machine_readable_json), ('.csv', export_machine_readable_csv_bytes)):
+        content = export(submission(), created_at)
+        source = tmp_path / f"alex{suffix}"
+        source.write_bytes(content if isinstance(content, bytes) else content.encode('utf-8'))
+        output_dir = tmp_path / suffix.strip('.')
+        assert run_batch([str(source)], str(output_dir), jobs=1) == (1, [])
+        outputs[suffix] = sorted(name for name in os.listdir(output_dir) if name.startswith('flow_'))
+
+    assert outputs['.json'] == outputs['.csv']
+    assert all("_20250102_030405_" in name for name in outputs['.json'])
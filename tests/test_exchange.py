@@ -0,0 +1,88 @@
+"""Import/Export: Team-Bundles und Upload-Normalisierung"""
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from flowcore import (DOMAINS, export_machine_readable_json, export_team_bundle_bytes, iter_validated_upload_frames,
+                      load_team_bundle, parse_and_normalize_upload, validate_and_prepare_data)
+
+
+class Upload(BytesIO):
+    """Minimaler Ersatz für ein hochgeladenes File-Objekt (Inhalt + Name)"""
+    def __init__(self, name, content):
+        super().__init__(content)
+        self.name = name
+
+
+def export_frame(name="Alex", created_at="2025-01-02T03:04:05"):
+    data = {"Name": name}
+    for domain in DOMAINS:
+        data.update({f"Skill_{domain}": 3, f"Challenge_{domain}": 5, f"Time_{domain}": 1})
+    parsed, _ = parse_and_normalize_upload(Upload("a.json", export_machine_readable_json(data, created_at).encode()))
+    frame, _, _ = validate_and_prepare_data(parsed)
+    return frame
+
+
+def tampered_bundle(key, change):
+    arrays = dict(np.load(BytesIO(export_team_bundle_bytes([export_frame("Alex"), export_frame("Bea")]))))
+    arrays[key] = change(arrays[key])
+    buf = BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def test_team_bundle_round_trip():
+    df, error = load_team_bundle(export_team_bundle_bytes([export_frame("Alex"), export_frame("Bea")]))
+    assert error is None
+    assert len(df) == 2 * len(DOMAINS)
+    assert set(df['name']) == {"Alex", "Bea"}
+
+
+@pytest.mark.parametrize("key", ['domain_codes', 'name_codes', 'created_at_codes'])
+@pytest.mark.parametrize("change", [lambda codes: codes + 100, lambda codes: codes - 5], ids=["zu_gross", "negativ"])
+def test_team_bundle_rejects_codes_outside_their_table(key, change):
+    df, error = load_team_bundle(tampered_bundle(key, change))
+    assert df is None
+    assert key in error
+
+
+def test_mixed_utc_offsets_are_normalised_to_utc():
+    frame = export_frame("Alex", "2025-01-02T03:04:05")
+    other = export_frame("Bea", "2025-01-02T05:04:05+02:00")
+    assert frame['created_at'].dt.tz is None
+    assert other['created_at'].iloc[0] == frame['created_at'].iloc[0]
+
+    df, error = load_team_bundle(export_team_bundle_bytes([frame, other]))
+    assert error is None
+    assert df['created_at'].nunique() == 1
+
+
+def test_parallel_parsing_keeps_order_and_bounds_in_flight_files(monkeypatch):
+    import flowcore.exchange as exchange
+    monkeypatch.setattr(exchange, 'UPLOAD_PARSE_WORKERS', 2)
+    def files():
+        return [Upload(f"{i}.json", export_machine_readable_json({"Name": f"P{i}"}).encode()) for i in range(50)]
+    parsed_names = []
+    def parse(uploaded_file):
+        parsed_names.append(uploaded_file.name)
+        return parse_and_normalize_upload(uploaded_file)
+    monkeypatch.setattr(exchange, 'parse_and_normalize_upload', parse)
+
+    frames = exchange.iter_uploaded_file_frames(files(), [], parallel=True)
+    assert next(frames)[0] == "0.json"
+    frames.close()
+    # Fenster = 2 * Worker: beim Abbruch wurden höchstens 4 der 50 Dateien angefasst
+    assert len(parsed_names) <= 4
+
+    errors = []
+    names = [frame['name'].iloc[0] for _, frame in exchange.iter_uploaded_file_frames(files(), errors, parallel=True)]
+    assert names == [f"P{i}" for i in range(50)] and not errors
+
+
+def test_validation_errors_name_the_rejected_file():
+    invalid = Upload("ungueltig.csv", b"name,created_at,domain,skill,challenge,time_perception\nA,,Unbekannt,9,9,9\n")
+    errors = []
+    frames = list(iter_validated_upload_frames([Upload("liste.json", b"[]"), invalid], errors))
+    assert frames == []
+    assert errors[-1] == "ungueltig.csv: Datenvalidierungsfehler: Keine gültigen Zeilen"
@@ -0,0 +1,23 @@
+"""Paket-Import: öffentliche API (__all__) und Kaltstart ohne Matplotlib, PIL und Streamlit"""
+import json
+import os
+import subprocess
+import sys
+
+LAZY_PACKAGES = ('matplotlib', 'PIL', 'streamlit')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_flowcore_does_not_import_heavy_packages():
+    # Eigener Prozess - im Test-Prozess könnten die Pakete schon von anderen Tests geladen sein
+    script = (f"import json, sys; import flowcore; "
+              f"print(json.dumps([p for p in {LAZY_PACKAGES!r} if p in sys.modules]))")
+    result = subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
+
+
+def test_public_api_is_declared():
+    import flowcore
+    assert len(flowcore.__all__) == len(set(flowcore.__all__))
+    assert all(hasattr(flowcore, name) for name in flowcore.__all__)
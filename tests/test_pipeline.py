@@ -0,0 +1,28 @@
+"""Team-Analyse als Hintergrund-Job: Fortschritt, Fehler und validierte Frames"""
+from io import BytesIO
+
+from flowcore import DOMAINS, export_machine_readable_json, new_team_analysis_job, run_team_analysis
+
+
+class Upload(BytesIO):
+    def __init__(self, name, content):
+        super().__init__(content)
+        self.name = name
+
+
+def export_upload(name):
+    data = {"Name": name}
+    for domain in DOMAINS:
+        data.update({f"Skill_{domain}": 4, f"Challenge_{domain}": 4, f"Time_{domain}": 0})
+    return Upload(f"{name}.json", export_machine_readable_json(data).encode())
+
+
+def test_progress_counts_unreadable_files_at_the_end():
+    files = [export_upload("Alex"), export_upload("Bea"), Upload("kaputt.json", b"{"), Upload("leer.csv", b"")]
+    job = run_team_analysis(new_team_analysis_job(len(files)), files, client_charts=True)
+
+    assert job['status'] == 'done'
+    assert all(job['progress'][stage] == (4, 4) for stage in ('parse', 'validate', 'aggregate'))
+    assert [error.split(":")[0] for error in job['errors']] == ["kaputt.json", "leer.csv"]
+    assert len(job['frames']) == 2
+    assert job['aggregates']['participant_count'] == 2
@@ -0,0 +1,36 @@
+"""Prozessweiter Berichts-Cache: Grösse per Umgebungsvariable, Stapelläufe ohne Cache"""
+import json
+import os
+import subprocess
+import sys
+
+from flowcore import DOMAINS, build_machine_readable_payload, generate_comprehensive_smart_report, report_cache_info
+from flowcore.batch import run_batch
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_report_cache_size_from_environment():
+    env = dict(os.environ, FLOWCORE_REPORT_CACHE_SIZE="7")
+    output = subprocess.run(
+        [sys.executable, "-c", "import flowcore; print(flowcore.report_cache_info().maxsize)"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "7"
+
+
+def test_batch_run_bypasses_report_cache(tmp_path):
+    data = {"Name": "Alex"}
+    for domain in DOMAINS:
+        data.update({f"Skill_{domain}": 2, f"Challenge_{domain}": 6, f"Time_{domain}": -1})
+    export = tmp_path / "alex.json"
+    export.write_text(json.dumps(build_machine_readable_payload(data, "2025-01-02T03:04:05")), encoding="utf-8")
+
+    before = report_cache_info()
+    reports, errors = run_batch([str(export)], str(tmp_path / "out"), jobs=1)
+    assert (reports, errors) == (1, [])
+    after = report_cache_info()
+    assert (after.hits, after.misses, after.currsize) == (before.hits, before.misses, before.currsize)
+
+    report = next((tmp_path / "out").glob("flow_bericht_*.txt")).read_text(encoding="utf-8")
+    assert report == generate_comprehensive_smart_report(data)
+
@@ -0,0 +1,76 @@
+"""SQLite-Speicher: Sammelimport von Exporten und materialisierte Team-Aggregate"""
+import sqlite3
+
+import pytest
+
+from flowcore import (DOMAINS, build_machine_readable_payload, bulk_save_payloads, get_materialized_team_aggregates,
+                      payload_to_data, query_team_aggregates, reset_database, save_to_db)
+from flowcore.storage import get_db_connection
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """Leere flow_data.db im Temp-Verzeichnis (die Verbindung ist pro Prozess gecacht)"""
+    monkeypatch.chdir(tmp_path)
+    get_db_connection.cache_clear()
+    yield
+    get_db_connection()[0].close()
+    get_db_connection.cache_clear()
+
+
+def payload(name="Alex", created_at="2025-01-02T03:04:05"):
+    data = {"Name": name}
+    for domain in DOMAINS:
+        data.update({f"Skill_{domain}": 3, f"Challenge_{domain}": 5, f"Time_{domain}": 1})
+    return build_machine_readable_payload(data, created_at)
+
+
+def test_bulk_save_counts_non_dict_payloads_as_invalid(fresh_db):
+    broken = payload("Bea")
+    broken["domains"][next(iter(DOMAINS))] = [3, 5, 1]
+    report = bulk_save_payloads([[1, 2], None, "text", 7, broken, payload()])
+    assert report['invalid'] == 5
+    assert report['submissions'] == 1
+    assert report['responses'] == len(DOMAINS)
+
+
+def test_bulk_save_skips_duplicates(fresh_db):
+    assert bulk_save_payloads([payload(), payload()])['duplicates'] == 1
+    report = bulk_save_payloads([payload()])
+    assert report['duplicates'] == 1
+    assert report['submissions'] == 0
+
+
+def test_materialized_participant_count_matches_query(fresh_db):
+    save_to_db(payload_to_data(payload("Alex")))
+    save_to_db(payload_to_data(payload("Alex")))
+    bulk_save_payloads([payload("Alex", "2025-02-01T00:00:00"), payload("Bea"), payload("Cem")])
+    assert get_materialized_team_aggregates()['participant_count'] == 3
+    assert query_team_aggregates()['participant_count'] == 3
+
+    reset_database()
+    assert get_materialized_team_aggregates()['participant_count'] == 0
+
+
+def test_migration_backfills_participants(fresh_db):
+    bulk_save_payloads([payload("Alex"), payload("Bea"), payload("Bea", "2025-02-01T00:00:00")])
+    conn = get_db_connection()[0]
+    conn.execute("DROP TABLE team_participants")
+    conn.execute("DROP TABLE team_participant_count")
+    conn.execute("PRAGMA user_version = 2")
+    conn.close()
+    get_db_connection.cache_clear()
+
+    assert get_materialized_team_aggregates()['participant_count'] == 2
+
+
+def test_name_filter_beyond_sqlite_variable_limit(fresh_db):
+    bulk_save_payloads([payload("Alex"), payload("Bea")])
+    # Limit älterer SQLite-Versionen nachbilden und mehr Namen auswählen, als Platzhalter erlaubt sind
+    get_db_connection()[0].setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    names = ["Alex"] + [f"Unbekannt {i}" for i in range(5000)]
+    assert query_team_aggregates(names=names)['participant_count'] == 1
+
+    # Die Filter-Transaktion ist abgeschlossen - neue Einreichungen sind sofort sichtbar
+    bulk_save_payloads([payload("Alex", "2025-03-01T00:00:00")])
+    assert query_team_aggregates(names=["Alex"])['domain_stats']['count'].iloc[0] == 2